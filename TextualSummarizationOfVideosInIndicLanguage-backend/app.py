@@ -1,15 +1,16 @@
 # app.py BACKEND 
 import torch
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, Response, stream_with_context, g, send_file
 from flask_cors import CORS
-import base64
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 from pathlib import Path
 import logging
-import yt_dlp
 import random
 import time
+import threading
 import json
+import hashlib
 from datetime import datetime
 
 # Universal device detection - works for both CPU and GPU
@@ -34,23 +35,133 @@ os.environ["BHASHINI_API_KEY"] = BHASHINI_API_KEY
 # Import functions from main
 from main import (
     download_youtube_audio,
-    transcribe_audio,
+    transcribe_audio_segments,
+    transcription_confidence,
     detect_language,
-    summarize_pipeline,
+    summarize_to_english,
+    translate_summary,
     save_summary_as_audio,
+    create_workspace,
+    remove_workspace,
+    cleanup_stale_workspaces,
+    WHISPER_TIERS,
+    DEFAULT_WHISPER_TIER,
+    resolve_whisper_tier,
+    whisper_cache_id,
+    SUMMARIZER_MODEL_ID,
+    start_model_loading,
+    translation_memory,
+    video_metadata,
+    get_video_metadata,
+    bhashini_endpoints,
+    models_ready,
+    model_status,
+    model_memory,
 )
 
+from jobs import JobManager
+from cache import ResultCache, StageCache, source_key_for
+from uploads import UploadSink
+from artifacts import ArtifactStore
+from feedback_store import FeedbackStore, parse_rating
+from tts import sentence_audio_cache, resolve_audio_format, probe_audio
+import metrics
+from metrics import STAGE_DURATION, STAGE_RUNS, STAGE_ERRORS, REQUESTS, language_label
+
+# Largest accepted request body (video uploads); bigger requests get 413
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", "2048")) * 1024 * 1024
+
+class StreamingUploadRequest(Request):
+    """
+    Multipart file parts are written straight into an UploadSink in a fresh
+    workspace as they arrive (hashing + ffmpeg audio extraction on the fly)
+    instead of being spooled to a temporary file first.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        sink = UploadSink(create_workspace(prefix="upload_"))
+        g.setdefault("upload_sinks", []).append(sink)
+        return sink
+
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES
 CORS(app)
 
-# Health check endpoint
+@app.teardown_request
+def discard_unused_uploads(exc=None):
+    # Upload workspaces not handed to a pipeline run (bad request, extra file fields)
+    for sink in g.pop("upload_sinks", []):
+        if not sink.adopted:
+            sink.close()
+            remove_workspace(sink.workspace)
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({
+        "error": f"Upload exceeds the {UPLOAD_MAX_BYTES // (1024 * 1024)} MB limit",
+        "status": "error",
+    }), 413
+
+# Background pipeline workers for job-submission mode
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+PIPELINE_STAGES = ["audio_download", "transcription", "summarization", "audio_generation"]
+# Artifacts are immutable, so clients may reuse them for this long without revalidating
+ARTIFACT_MAX_AGE = int(os.getenv("ARTIFACT_MAX_AGE", "86400"))
+
+# Service singletons, created by init_services() rather than at import time:
+# transcription worker processes re-import this script under spawn ("__mp_main__")
+# and must not open the stores, migrate feedback or start the server's models.
+job_manager = None
+# Finished /summarize payloads, keyed by input content + language + model versions
+result_cache = None
+# Transcripts, English summaries and per-language translations
+stage_cache = None
+# User ratings (feedback.db; imports a legacy feedback.json on first start)
+feedback_store = None
+# Summary audio, transcript and segments of each run, served from /artifacts
+artifact_store = None
+_services_lock = threading.Lock()
+
+def init_services():
+    """Create the job queue, caches and stores, register /metrics gauges and start loading models (idempotent)."""
+    global job_manager, result_cache, stage_cache, feedback_store, artifact_store
+    with _services_lock:
+        if job_manager is not None:
+            return
+        result_cache = ResultCache()
+        stage_cache = StageCache()
+        feedback_store = FeedbackStore()
+        artifact_store = ArtifactStore()
+        _register_scrape_metrics()
+        job_manager = JobManager(max_workers=PIPELINE_WORKERS)
+        # Models load in the background so the server answers /health right away
+        start_model_loading()
+
+@app.before_request
+def ensure_services():
+    # `python app.py` initializes in __main__; under a WSGI server the first request does
+    init_services()
+
+# Health check endpoint (liveness: the process is up, models may still be loading)
 @app.route("/health", methods=["GET"])
 def health_check():
+    ready = models_ready()
     return jsonify({
         "status": "healthy",
-        "message": "Backend is running"
+        "message": "Backend is running" if ready else "Backend is running, models are still loading",
+        "ready": ready,
+        "models": model_status(),
+        "whisper_tiers": {name: tier["model"] for name, tier in WHISPER_TIERS.items()},
+        "default_whisper_tier": DEFAULT_WHISPER_TIER,
     })
 
+# Readiness endpoint: 503 until every model has loaded (and warmed up)
+@app.route("/ready", methods=["GET"])
+def readiness_check():
+    ready = models_ready()
+    return jsonify({"ready": ready, "models": model_status()}), 200 if ready else 503
+
 def format_duration(seconds):
     minutes = int(seconds // 60)
     remaining_seconds = int(seconds % 60)
@@ -62,23 +173,23 @@ def format_duration(seconds):
     else:
         return f"{minutes} minutes {remaining_seconds} seconds"
 
-def get_youtube_metadata(video_url: str):
-    """Fetch title and duration using yt_dlp."""
+def get_youtube_metadata(video_url: str, metadata: dict = None):
+    """Title and formatted duration from the video's metadata record (yt-dlp only on a cache miss)."""
     try:
-        ydl_opts = {"quiet": True, "skip_download": True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=False)
-            title = info.get("title", "Unknown Title")
-            duration_seconds = info.get("duration", 0)
-            formatted_duration = format_duration(duration_seconds)
-            return title, formatted_duration
+        info = metadata or get_video_metadata(video_url)
+        title = info.get("title") or "Unknown Title"
+        formatted_duration = format_duration(info.get("duration") or 0)
+        return title, formatted_duration
     except Exception as e:
         logger.error(f"❌ Metadata fetch failed: {e}")
         return "Unknown Title", "N/A"
 
 @app.route("/confidence_metrics", methods=["POST"])
 def confidence_metrics():
-    """Calculate confidence metrics for transcription"""
+    """
+    Calculate lexical confidence proxies for a transcript (legacy: /summarize now
+    returns Whisper-based `confidence` stats directly)
+    """
     try:
         data = request.json
         transcript = data.get("transcript", "")
@@ -115,26 +226,14 @@ def submit_feedback():
         rating = data.get("rating")
         feedback = data.get("feedback", "")
         summary_id = data.get("summary_id", "unknown")
-        
-        feedback_data = {
-            "timestamp": datetime.now().isoformat(),
-            "rating": rating,
-            "feedback": feedback,
-            "summary_id": summary_id
-        }
-        
-        # Append to feedback file
-        feedback_file = Path("feedback.json")
-        if not feedback_file.exists():
-            with open(feedback_file, "w") as f:
-                json.dump([], f)
-        
-        with open(feedback_file, "r+") as f:
-            feedback_list = json.load(f)
-            feedback_list.append(feedback_data)
-            f.seek(0)
-            json.dump(feedback_list, f, indent=2)
-        
+
+        parsed_rating = parse_rating(rating)
+        if rating is not None and parsed_rating is None:
+            return jsonify({"error": "rating must be an integer from 1 to 5"}), 400
+
+        # Append-only insert; the running aggregates are updated in the same transaction
+        feedback_store.add(parsed_rating, feedback, summary_id)
+
         return jsonify({"status": "success", "message": "Feedback saved"})
     
     except Exception as e:
@@ -142,143 +241,554 @@ def submit_feedback():
 
 @app.route("/get_feedback_stats", methods=["GET"])
 def get_feedback_stats():
-    """Get feedback statistics"""
+    """Get feedback statistics (read from the maintained aggregates, not the entries)"""
     try:
-        feedback_file = Path("feedback.json")
-        if not feedback_file.exists():
-            return jsonify({
-                "total_feedback": 0,
-                "average_rating": 0,
-                "rating_distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
-            })
-        
-        with open(feedback_file, "r") as f:
-            feedback_list = json.load(f)
-        
-        if not feedback_list:
-            return jsonify({
-                "total_feedback": 0,
-                "average_rating": 0,
-                "rating_distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
-            })
-        
-        total = len(feedback_list)
-        ratings = [item["rating"] for item in feedback_list if "rating" in item]
-        avg_rating = sum(ratings) / len(ratings) if ratings else 0
-        
-        rating_dist = {str(i): 0 for i in range(1, 6)}
-        for rating in ratings:
-            rating_dist[str(rating)] = rating_dist.get(str(rating), 0) + 1
-        
-        return jsonify({
-            "total_feedback": total,
-            "average_rating": round(avg_rating, 2),
-            "rating_distribution": rating_dist
-        })
+        return jsonify(feedback_store.stats())
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/summarize", methods=["POST"])
-def summarize():
-    start_time = time.time()
-    processing_steps = {}
-    
+class SummarizeError(Exception):
+    """Pipeline failure carrying the HTTP status the API should answer with."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _parse_form():
+    """request.form and request.files; oversized bodies become a SummarizeError (413)."""
     try:
-        processing_steps["start"] = time.time()
-        video_url = request.form.get("url") or request.form.get("video_url")
-        # Simple check for direct video URLs
-        if video_url and not ("youtube.com" in video_url or "youtu.be" in video_url):
-            return jsonify({"error": "Only YouTube URLs supported. Use YouTube links or file upload.", "status": "error"}), 400
-        
-        target_language = (request.form.get("language") or "en").strip().lower()
-        uploaded_file = request.files.get("file")
+        # Parsing the body is what streams the upload in (see StreamingUploadRequest)
+        return request.form, request.files
+    except RequestEntityTooLarge:
+        raise SummarizeError(f"Upload exceeds the {UPLOAD_MAX_BYTES // (1024 * 1024)} MB limit", 413)
 
-        if not video_url and not uploaded_file:
-            return jsonify({"error": "No video URL or file provided", "status": "error"}), 400
+def read_summarize_params():
+    """Validate the /summarize form and persist any upload so a worker can pick it up later."""
+    form, files = _parse_form()
 
-        video_title, video_duration = "N/A", "N/A"
+    video_url = form.get("url") or form.get("video_url")
+    # Simple check for direct video URLs
+    if video_url and not ("youtube.com" in video_url or "youtu.be" in video_url):
+        raise SummarizeError("Only YouTube URLs supported. Use YouTube links or file upload.", 400)
 
-        # Step 1: Audio Source
-        processing_steps["audio_start"] = time.time()
-        if video_url:
+    target_language = (form.get("language") or "en").strip().lower()
+    uploaded_file = files.get("file")
+
+    if not video_url and not uploaded_file:
+        raise SummarizeError("No video URL or file provided", 400)
+
+    # Speed/quality trade-off for transcription: fast / balanced / accurate
+    try:
+        whisper_tier = resolve_whisper_tier(form.get("whisper_tier") or None)
+    except ValueError as e:
+        raise SummarizeError(str(e), 400)
+
+    # Summary speech encoding: mp3 / opus at an optional bitrate such as "48k"
+    try:
+        audio_format, audio_bitrate = resolve_audio_format(
+            form.get("audio_format") or None, form.get("audio_bitrate") or None
+        )
+    except ValueError as e:
+        raise SummarizeError(str(e), 400)
+
+    # Each request owns its workspace; run_summarize removes it when done.
+    # An upload already streamed into its own workspace, which the run takes over;
+    # finishing its audio extraction is left to the run (it may take a second ffmpeg pass).
+    upload_path = upload_sha256 = None
+    sink = uploaded_file.stream if uploaded_file and not video_url else None
+    if isinstance(sink, UploadSink):
+        if not sink.size:
+            raise SummarizeError("Uploaded file is empty", 400)
+        sink.adopted = True
+        workspace = sink.workspace
+        upload_sha256 = sink.sha256
+        logger.info(f"📦 Upload received: {sink.size / (1024 * 1024):.1f} MB")
+    else:
+        sink = None
+        workspace = create_workspace()
+        if uploaded_file and not video_url:
             try:
-                audio_path = download_youtube_audio(video_url)
-                video_title, video_duration = get_youtube_metadata(video_url)
-                logger.info(f"✅ Audio downloaded: {audio_path}")
-                logger.info(f"🎞️ Title: {video_title}, ⏱ Duration: {video_duration}")
-            except Exception as e:
-                return jsonify({"error": f"YouTube download failed: {str(e)}", "status": "error"}), 400
-        else:
-            audio_dir = Path("audio_files")
-            audio_dir.mkdir(exist_ok=True)
-            audio_path = audio_dir / "audio.wav"
-            uploaded_file.save(audio_path)
-            video_title = "Uploaded File"
-        processing_steps["audio_end"] = time.time()
-
-        # Step 2: Transcription
-        processing_steps["transcription_start"] = time.time()
-        transcript = transcribe_audio(verbose=True)
-        processing_steps["transcription_end"] = time.time()
-
-        # Step 3: Summarization
-        processing_steps["summarization_start"] = time.time()
-        english_summary, final_summary = summarize_pipeline(transcript, target_language, video_url, DEVICE)
-        processing_steps["summarization_end"] = time.time()
-
-        # Step 4: Audio Generation
-        processing_steps["audio_gen_start"] = time.time()
+                upload_path = workspace / "upload"
+                uploaded_file.save(upload_path)
+            except Exception:
+                remove_workspace(workspace)
+                raise
+
+    return {
+        "video_url": video_url,
+        "target_language": target_language,
+        "whisper_tier": whisper_tier,
+        "audio_format": audio_format,
+        "audio_bitrate": audio_bitrate,
+        "workspace": str(workspace),
+        "upload_path": str(upload_path) if upload_path else None,
+        "upload_sha256": upload_sha256,
+        "upload_sink": sink,
+        "use_cache": form.get("cache", "1").strip().lower() not in ("0", "false", "no"),
+    }
+
+def _artifacts_available(result: dict) -> bool:
+    """True if every artifact a (cached) result links to is still on disk."""
+    artifact_id = result.get("artifact_id")
+    if not artifact_id:
+        return False
+    return all(
+        artifact_store.exists(artifact_id, url.rsplit("/", 1)[-1])
+        for url in (result.get("artifacts") or {}).values() if url
+    )
+
+def _new_summary_id(video_title: str) -> str:
+    return hashlib.md5(f"{video_title}_{datetime.now().isoformat()}".encode()).hexdigest()[:8]
+
+def run_summarize(params: dict, job=None) -> dict:
+    """
+    Run download → transcription → summarization → TTS for one request.
+    `job` (optional) receives per-stage progress reports.
+    All intermediate files live in the request's workspace, which is removed afterwards.
+    """
+    workspace = Path(params.get("workspace") or create_workspace())
+    # The metrics stage the run is in, so a failure is counted against it
+    tracker = {"stage": "setup"}
+    try:
+        return _run_summarize(params, workspace, job, tracker)
+    except Exception:
+        STAGE_ERRORS.inc(stage=tracker["stage"], language=language_label(params.get("target_language", "en")))
+        raise
+    finally:
+        if params.get("upload_sink") is not None:
+            # Stops an extraction that was never finished (e.g. on a result cache hit)
+            params["upload_sink"].close()
+        remove_workspace(workspace)
+
+def _run_summarize(params: dict, workspace: Path, job=None, tracker: dict = None) -> dict:
+    def report(stage, status, progress=None):
+        if job is not None:
+            job.report(stage, status, progress)
+
+    tracker = tracker if tracker is not None else {}
+    language = language_label(params.get("target_language", "en"))
+
+    # Metrics stages (download / transcription / summarization / translation / tts) are
+    # finer than the job's progress stages and only timed when they actually run
+    def begin(stage):
+        tracker["stage"] = stage
+        STAGE_RUNS.inc(stage=stage, language=language)
+        return time.time()
+
+    def end(stage, started):
+        STAGE_DURATION.observe(time.time() - started, stage=stage)
+
+    # Streaming hooks: only jobs have listeners, synchronous requests skip them
+    on_segment = on_transcription_progress = on_chunk_summary = None
+    if job is not None:
+        def on_segment(segment):
+            job.emit("segment", segment)
+
+        def on_transcription_progress(fraction):
+            job.report("transcription", "running", fraction)
+
+        summarized_chunks = []
+
+        def on_chunk_summary(index, total, text):
+            # Batches finish out of input order, so progress counts completed chunks
+            summarized_chunks.append(index)
+            job.emit("chunk_summary", {"index": index, "total": total, "text": text})
+            job.report("summarization", "running", len(summarized_chunks) / (total + 1))
+
+    start_time = time.time()
+    processing_steps = {"start": start_time}
+    video_url = params.get("video_url")
+    target_language = params.get("target_language", "en")
+    whisper_tier = resolve_whisper_tier(params.get("whisper_tier"))
+    whisper_id = whisper_cache_id(whisper_tier)
+    audio_format, audio_bitrate = resolve_audio_format(params.get("audio_format"), params.get("audio_bitrate"))
+    video_title, video_duration = "N/A", "N/A"
+    metadata = None
+
+    # Step 0: Result cache (YouTube id or upload content hash + language + models/tier)
+    cache_key = None
+    source_key = source_key_for(video_url, params.get("upload_path"), params.get("upload_sha256"))
+    if source_key and params.get("use_cache", True):
+        cache_key = ResultCache.make_key(source_key, target_language, whisper_id, SUMMARIZER_MODEL_ID,
+                                         variant=f"{audio_format}@{audio_bitrate or 'source'}")
+        cached = result_cache.get(cache_key)
+        # Entries whose artifacts have expired are recomputed
+        if cached is not None and _artifacts_available(cached):
+            logger.info(f"⚡ Result cache hit for {source_key} ({target_language})")
+            REQUESTS.inc(language=language, cached="true")
+            for stage in PIPELINE_STAGES:
+                report(stage, "done")
+            cached["summary_id"] = _new_summary_id(cached["metrics"].get("video_title", "N/A"))
+            cached["cached"] = True
+            cached["metrics"]["processing_time"] = round(time.time() - start_time, 3)
+            return cached
+    REQUESTS.inc(language=language, cached="false")
+
+    # Intermediate artifacts: a new target language for a known video skips
+    # straight to translation
+    use_stage_cache = bool(source_key) and params.get("use_cache", True)
+    transcript_parts = (source_key, whisper_id)
+    summary_parts = transcript_parts + (SUMMARIZER_MODEL_ID,)
+    cached_transcript = stage_cache.get("transcript", *transcript_parts) if use_stage_cache else None
+
+    # Step 1: Audio Source
+    processing_steps["audio_start"] = time.time()
+    report("audio_download", "running")
+    if cached_transcript is not None:
+        logger.info(f"⚡ Transcript cache hit for {source_key}, skipping download")
+        video_title = cached_transcript.get("video_title", "N/A")
+        video_duration = cached_transcript.get("video_duration", "N/A")
+    elif video_url:
+        started = begin("download")
         try:
-            audio_path = save_summary_as_audio(final_summary, target_language)
-        except:
-            audio_path = None
-        processing_steps["audio_gen_end"] = time.time()
-
-        # Calculate step timings
-        processing_times = {
-            "audio_download": round(processing_steps["audio_end"] - processing_steps["audio_start"], 2),
-            "transcription": round(processing_steps["transcription_end"] - processing_steps["transcription_start"], 2),
-            "summarization": round(processing_steps["summarization_end"] - processing_steps["summarization_start"], 2),
-            "audio_generation": round(processing_steps["audio_gen_end"] - processing_steps["audio_gen_start"], 2),
-            "total": round(time.time() - start_time, 2)
-        }
+            # The record yt-dlp extracted while downloading is passed to every consumer
+            audio_path, metadata = download_youtube_audio(video_url, workspace)
+            logger.info(f"✅ Audio downloaded: {audio_path}")
+        except Exception as e:
+            raise SummarizeError(f"YouTube download failed: {str(e)}", 400)
+        end("download", started)
+        video_title, video_duration = get_youtube_metadata(video_url, metadata)
+        logger.info(f"🎞️ Title: {video_title}, ⏱ Duration: {video_duration}")
+    else:
+        sink = params.get("upload_sink")
+        audio_path = sink.finish() if sink is not None else params["upload_path"]
+        logger.info(f"✅ Upload audio ready: {Path(audio_path).name}")
+        video_title = "Uploaded File"
+    report("audio_download", "done")
+    processing_steps["audio_end"] = time.time()
 
-        # Generate a unique ID for this summary
-        import hashlib
-        summary_id = hashlib.md5(f"{video_title}_{datetime.now().isoformat()}".encode()).hexdigest()[:8]
-
-        # Step 5: Response
-        response_data = {
-            "transcript": transcript,
-            "english_summary": english_summary,
-            "summary": final_summary,
-            "summary_audio": None,
-            "summary_id": summary_id,
-            "status": "success",
-            "metrics": {
-                "video_title": video_title,
-                "video_duration": video_duration,
-                "transcript_length": len(transcript),
-                "english_summary_length": len(english_summary),
-                "final_summary_length": len(final_summary),
-                "target_language": target_language,
-                "processing_time": processing_times["total"],
-                "processing_times": processing_times
-            }
+    # Step 2: Transcription
+    processing_steps["transcription_start"] = time.time()
+    report("transcription", "running")
+    if cached_transcript is not None:
+        transcription = cached_transcript
+    else:
+        started = begin("transcription")
+        transcription = transcribe_audio_segments(audio_path, verbose=True, out_dir=workspace,
+                                                  on_segment=on_segment,
+                                                  on_progress=on_transcription_progress,
+                                                  tier=whisper_tier)
+        end("transcription", started)
+        if use_stage_cache:
+            stage_cache.put("transcript", dict(transcription, video_title=video_title,
+                                               video_duration=video_duration), *transcript_parts)
+    transcript = transcription["text"]
+    # Transcripts cached before confidence stats existed get them computed here
+    confidence = transcription.get("confidence") or transcription_confidence(transcription.get("segments", []))
+    report("transcription", "done")
+    processing_steps["transcription_end"] = time.time()
+
+    # Step 3: Summarization
+    processing_steps["summarization_start"] = time.time()
+    report("summarization", "running")
+    cached_summary = stage_cache.get("english_summary", *summary_parts) if use_stage_cache else None
+    if cached_summary is not None:
+        english_summary = cached_summary["english_summary"]
+    else:
+        started = begin("summarization")
+        english_summary = summarize_to_english(transcript, video_url, on_chunk_summary=on_chunk_summary,
+                                               metadata=metadata)
+        end("summarization", started)
+        if use_stage_cache:
+            stage_cache.put("english_summary", {"english_summary": english_summary}, *summary_parts)
+
+    cached_translation = None
+    if use_stage_cache and target_language != "en":
+        cached_translation = stage_cache.get("translation", *summary_parts, target_language)
+    if target_language == "en":
+        # Nothing to translate (and nothing to time)
+        final_summary = english_summary
+    elif cached_translation is not None:
+        final_summary = cached_translation["summary"]
+    else:
+        started = begin("translation")
+        final_summary = translate_summary(english_summary, target_language)
+        end("translation", started)
+        if use_stage_cache:
+            stage_cache.put("translation", {"summary": final_summary}, *summary_parts, target_language)
+    report("summarization", "done")
+    processing_steps["summarization_end"] = time.time()
+
+    # Step 4: Audio Generation
+    processing_steps["audio_gen_start"] = time.time()
+    report("audio_generation", "running")
+    started = begin("tts")
+    try:
+        audio_path = save_summary_as_audio(
+            final_summary, target_language, out_dir=workspace,
+            on_progress=(lambda fraction: report("audio_generation", "running", fraction)) if job else None,
+            audio_format=audio_format, bitrate=audio_bitrate,
+        )
+        end("tts", started)
+    except:
+        # The run still succeeds without speech, but the failure is counted
+        STAGE_ERRORS.inc(stage="tts", language=language)
+        audio_path = None
+    tracker["stage"] = "response"
+    report("audio_generation", "done")
+    processing_steps["audio_gen_end"] = time.time()
+
+    # Calculate step timings
+    processing_times = {
+        "audio_download": round(processing_steps["audio_end"] - processing_steps["audio_start"], 2),
+        "transcription": round(processing_steps["transcription_end"] - processing_steps["transcription_start"], 2),
+        "summarization": round(processing_steps["summarization_end"] - processing_steps["summarization_start"], 2),
+        "audio_generation": round(processing_steps["audio_gen_end"] - processing_steps["audio_gen_start"], 2),
+        "total": round(time.time() - start_time, 2)
+    }
+
+    # Generate a unique ID for this summary
+    summary_id = _new_summary_id(video_title)
+
+    # Store the generated files; the response only links to them
+    artifact_id = artifact_store.create()
+    audio_info = None
+    artifacts = {
+        "summary_audio": None,
+        "transcript": ArtifactStore.url(artifact_id, "transcript.txt"),
+        "segments": ArtifactStore.url(artifact_id, "segments.json"),
+    }
+    artifact_store.add_text(artifact_id, "transcript.txt", transcript)
+    artifact_store.add_json(artifact_id, "segments.json", transcription.get("segments", []))
+    if audio_path and Path(audio_path).exists():
+        audio_name = f"summary_audio{Path(audio_path).suffix}"
+        stored_audio = artifact_store.add_file(artifact_id, audio_name, audio_path)
+        artifacts["summary_audio"] = ArtifactStore.url(artifact_id, audio_name)
+        # Format, MIME type, size, duration and bitrate of what was actually written
+        audio_info = probe_audio(stored_audio)
+
+    # Step 5: Response
+    # The transcript itself is only linked (artifacts["transcript"]), not embedded
+    response_data = {
+        "english_summary": english_summary,
+        "summary": final_summary,
+        "summary_audio_url": artifacts["summary_audio"],
+        "summary_audio_info": audio_info,
+        "artifact_id": artifact_id,
+        "artifacts": artifacts,
+        "summary_id": summary_id,
+        "confidence": confidence,
+        "cached": False,
+        "status": "success",
+        "metrics": {
+            "video_title": video_title,
+            "video_duration": video_duration,
+            "transcript_length": len(transcript),
+            "english_summary_length": len(english_summary),
+            "final_summary_length": len(final_summary),
+            "target_language": target_language,
+            "whisper_tier": whisper_tier,
+            "whisper_model": WHISPER_TIERS[whisper_tier]["model"],
+            "processing_time": processing_times["total"],
+            "processing_times": processing_times
         }
+    }
 
-        if audio_path and Path(audio_path).exists():
-            with open(audio_path, "rb") as f:
-                response_data["summary_audio"] = base64.b64encode(f.read()).decode("utf-8")
-        
-        return jsonify(response_data)
+    if cache_key:
+        try:
+            result_cache.put(cache_key, response_data, source_key, target_language,
+                             whisper_id, SUMMARIZER_MODEL_ID)
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache write failed: {e}")
+
+    return response_data
+
+def _is_async_request() -> bool:
+    flag = request.args.get("async") or _parse_form()[0].get("async") or ""
+    return flag.strip().lower() in ("1", "true", "yes")
+
+def _submit_job():
+    params = read_summarize_params()
+    job = job_manager.submit(run_summarize, params, PIPELINE_STAGES)
+    logger.info(f"📥 Job {job.id} queued (queue depth: {job_manager.queue_depth()})")
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "result_url": f"/jobs/{job.id}/result",
+    }), 202
+
+@app.route("/summarize", methods=["POST"])
+def summarize():
+    try:
+        if _is_async_request():
+            return _submit_job()
+        return jsonify(run_summarize(read_summarize_params()))
 
+    except SummarizeError as e:
+        return jsonify({"error": str(e), "status": "error"}), e.status_code
     except Exception as e:
         logger.error(f"❌ Unexpected error: {e}")
         return jsonify({"error": f"Unexpected error: {str(e)}", "status": "error"}), 500
 
+@app.route("/artifacts/<artifact_id>/<name>", methods=["GET"])
+def get_artifact(artifact_id, name):
+    """Serve a generated file with ETag / Last-Modified validation and Range support"""
+    path = artifact_store.path(artifact_id, name)
+    if path is None or not path.is_file():
+        return jsonify({"error": "Artifact not found", "status": "error"}), 404
+    return send_file(path, conditional=True, etag=True, max_age=ARTIFACT_MAX_AGE)
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Result, stage, translation memory and video metadata cache sizes and hit/miss counters"""
+    try:
+        return jsonify({
+            "results": result_cache.stats(),
+            "stages": stage_cache.stats(),
+            "translation_memory": translation_memory.stats(),
+            "metadata": video_metadata.stats(),
+            "tts_sentences": sentence_audio_cache.stats(),
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _cache_samples(field):
+    caches = {
+        "results": result_cache.stats,
+        "stages": stage_cache.stats,
+        "translation_memory": translation_memory.stats,
+        "metadata": video_metadata.stats,
+        "tts_sentences": sentence_audio_cache.stats,
+    }
+
+    def collect():
+        samples = []
+        for name, stats in caches.items():
+            value = stats().get(field)
+            # The stage cache counts per stage (transcript / english_summary / translation)
+            if isinstance(value, dict):
+                samples.extend(((name, stage), v) for stage, v in sorted(value.items()))
+            else:
+                samples.append(((name, ""), value))
+        return samples
+    return collect
+
+def _process_memory():
+    values = []
+    try:
+        with open("/proc/self/statm") as f:
+            values.append((("rss",), int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")))
+    except (OSError, ValueError, IndexError):
+        pass
+    if torch.cuda.is_available():
+        values.append((("cuda_allocated",), torch.cuda.memory_allocated()))
+    return values
+
+def _register_scrape_metrics():
+    """Gauges and counters read from the caches, job queue and models when /metrics is requested."""
+    metrics.registry.register(metrics.ScrapedCounter(
+        "videosu_cache_hits_total", "Cache hits per cache (and per stage for the stage cache)",
+        _cache_samples("hits"), ["cache", "stage"],
+    ))
+    metrics.registry.register(metrics.ScrapedCounter(
+        "videosu_cache_misses_total", "Cache misses per cache (and per stage for the stage cache)",
+        _cache_samples("misses"), ["cache", "stage"],
+    ))
+    metrics.registry.register(metrics.Gauge(
+        "videosu_cache_hit_ratio", "Cache hit ratio per cache (and per stage for the stage cache)",
+        _cache_samples("hit_ratio"), ["cache", "stage"],
+    ))
+    metrics.registry.register(metrics.Gauge(
+        "videosu_jobs", "Pipeline jobs by status", lambda: [
+            (("queued",), job_manager.queue_depth()),
+            (("running",), job_manager.running_count()),
+        ], ["status"],
+    ))
+    metrics.registry.register(metrics.Gauge(
+        "videosu_model_memory_bytes", "Parameter and buffer bytes of each loaded model",
+        lambda: [((name,), size) for name, size in model_memory().items()], ["model"],
+    ))
+    metrics.registry.register(metrics.Gauge(
+        "videosu_process_memory_bytes", "Resident memory of the server process and allocated CUDA memory",
+        _process_memory, ["kind"],
+    ))
+    metrics.registry.register(metrics.Gauge(
+        "videosu_models_ready", "1 once every model has loaded", lambda: [((), int(models_ready()))],
+    ))
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus text exposition: stage latencies, request/error counters, caches, queue and memory"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route("/translation/endpoints", methods=["GET"])
+def translation_endpoints():
+    """Circuit state and rolling latency/error stats per Bhashini endpoint"""
+    return jsonify(bhashini_endpoints.stats())
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queue a summarize job and return its id immediately."""
+    try:
+        return _submit_job()
+    except SummarizeError as e:
+        return jsonify({"error": str(e), "status": "error"}), e.status_code
+    except Exception as e:
+        logger.error(f"❌ Job submission failed: {e}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": "error"}), 500
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Job status with per-stage progress"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id", "status": "error"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Server-sent events for a job: stage transitions, transcribed segments and
+    chunk summaries as they are produced, then a final result/error event.
+    Reconnecting clients can resume with the Last-Event-ID header.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id", "status": "error"}), 404
+
+    try:
+        after = int(request.headers.get("Last-Event-ID") or request.args.get("after") or 0)
+    except ValueError:
+        after = 0
+
+    def stream():
+        yield "retry: 3000\n\n"
+        for event in job.iter_events(after=after):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event_type, data = event
+            yield f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    """Final /summarize payload once the job has finished"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id", "status": "error"}), 404
+    if job.status == "succeeded":
+        return jsonify(job.result)
+    if job.status == "failed":
+        return jsonify({"error": job.error, "status": "error"}), job.status_code or 500
+    return jsonify(job.to_dict()), 202
+
 if __name__ == "__main__":
-    for d in ["downloads", "audio_files", "file", "hf_models"]:
+    init_services()
+    for d in ["hf_models"]:
         Path(d).mkdir(exist_ok=True)
+    removed = cleanup_stale_workspaces()
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale workspaces")
+    removed = artifact_store.cleanup_expired()
+    if removed:
+        logger.info(f"🧹 Removed {removed} expired artifact directories")
     app.run(host="0.0.0.0", port=5000, debug=False, threaded=True)
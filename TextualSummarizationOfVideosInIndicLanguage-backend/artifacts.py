@@ -0,0 +1,82 @@
+# artifacts.py
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Generated files (summary audio, transcript, segments) live under <root>/<artifact id>/
+ARTIFACT_ROOT = Path(os.getenv("ARTIFACT_ROOT", "artifacts"))
+# Artifacts are removed this long after they were written (cached results that
+# point at removed artifacts are recomputed)
+ARTIFACT_RETENTION_SECONDS = int(os.getenv("ARTIFACT_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+_ARTIFACT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_ARTIFACT_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9]+$")
+
+
+class ArtifactStore:
+    """
+    Write-once files produced by a pipeline run, grouped under a random artifact id
+    and served by GET /artifacts/<id>/<name>. Files never change after they are
+    written, so they can be cached by clients and proxies.
+    """
+
+    def __init__(self, root: Path = ARTIFACT_ROOT, retention_seconds: int = ARTIFACT_RETENTION_SECONDS):
+        # Absolute, so paths handed to send_file don't depend on Flask's root_path
+        self.root = Path(root).resolve()
+        self.retention_seconds = retention_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._last_cleanup = 0.0
+
+    def create(self) -> str:
+        # Expired runs are swept at most once an hour, piggybacking on new runs
+        if time.time() - self._last_cleanup > 3600:
+            self._last_cleanup = time.time()
+            self.cleanup_expired()
+        artifact_id = uuid.uuid4().hex
+        (self.root / artifact_id).mkdir(parents=True)
+        return artifact_id
+
+    def path(self, artifact_id: str, name: str) -> Optional[Path]:
+        """Location of an artifact file, or None for ids/names that are not valid."""
+        if not _ARTIFACT_ID_RE.match(artifact_id or "") or not _ARTIFACT_NAME_RE.match(name or ""):
+            return None
+        return self.root / artifact_id / name
+
+    def add_file(self, artifact_id: str, name: str, source) -> Path:
+        target = self.path(artifact_id, name)
+        shutil.copyfile(source, target)
+        return target
+
+    def add_text(self, artifact_id: str, name: str, text: str) -> Path:
+        target = self.path(artifact_id, name)
+        target.write_text(text, encoding="utf-8")
+        return target
+
+    def add_json(self, artifact_id: str, name: str, value) -> Path:
+        return self.add_text(artifact_id, name, json.dumps(value, ensure_ascii=False))
+
+    def exists(self, artifact_id: str, name: str) -> bool:
+        path = self.path(artifact_id, name)
+        return path is not None and path.is_file()
+
+    @staticmethod
+    def url(artifact_id: str, name: str) -> str:
+        return f"/artifacts/{artifact_id}/{name}"
+
+    def cleanup_expired(self) -> int:
+        """Remove artifact directories older than the retention window. Returns how many were removed."""
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for entry in self.root.iterdir():
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
@@ -0,0 +1,425 @@
+# cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+# SQLite file shared by every cache in the backend
+CACHE_DB_PATH = Path(os.getenv("CACHE_DB_PATH", "cache.db"))
+
+# Size budget for cached /summarize payloads (bytes of stored JSON)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Size budget for intermediate artifacts (transcripts, English summaries, translations)
+STAGE_CACHE_MAX_BYTES = int(os.getenv("STAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Sentences kept in the translation memory before least recently used ones are dropped
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+
+# How long extracted YouTube metadata (title, description, duration) is reused
+METADATA_CACHE_TTL_SECONDS = int(os.getenv("METADATA_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+_YOUTUBE_ID_RE = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})")
+
+
+@contextmanager
+def _connect():
+    """Short-lived connection per operation; commits on success and always closes."""
+    conn = sqlite3.connect(str(CACHE_DB_PATH), timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _evict_lru(conn: sqlite3.Connection, table: str, key_column: str, max_bytes: int) -> int:
+    """Delete least recently used rows of `table` until its size_bytes total fits. Returns rows removed."""
+    total = conn.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    rows = conn.execute(f"SELECT {key_column}, size_bytes FROM {table} ORDER BY last_accessed ASC").fetchall()
+    for key, size in rows:
+        if total <= max_bytes:
+            break
+        conn.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (key,))
+        total -= size
+        removed += 1
+    return removed
+
+
+def extract_youtube_id(url: str) -> Optional[str]:
+    """Return the 11-character video id of a YouTube URL, or None."""
+    if not url:
+        return None
+    match = _YOUTUBE_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def hash_file(path, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_key_for(video_url: str = None, upload_path=None, upload_sha256: str = None) -> Optional[str]:
+    """
+    Content address of a request's input: YouTube id or hash of the uploaded file
+    (`upload_sha256` when it was already computed while the upload streamed in).
+    """
+    video_id = extract_youtube_id(video_url)
+    if video_id:
+        return f"yt:{video_id}"
+    if upload_sha256:
+        return f"sha256:{upload_sha256}"
+    if upload_path and Path(upload_path).exists():
+        return f"sha256:{hash_file(upload_path)}"
+    return None
+
+
+class ResultCache:
+    """
+    Persistent cache of final /summarize payloads.
+    Keyed by (source, target language, whisper model, summarizer model); least recently
+    used entries are evicted once the stored payloads exceed `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with _connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    source_key TEXT,
+                    target_language TEXT,
+                    whisper_model TEXT,
+                    summarizer_model TEXT,
+                    payload TEXT,
+                    size_bytes INTEGER,
+                    created_at REAL,
+                    last_accessed REAL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_lru ON result_cache(last_accessed)")
+
+    @staticmethod
+    def make_key(source_key: str, target_language: str, whisper_model: str, summarizer_model: str,
+                 variant: str = "") -> str:
+        """`variant` distinguishes output options that change the payload (e.g. the audio format)."""
+        parts = [source_key, target_language, whisper_model, summarizer_model]
+        if variant:
+            parts.append(variant)
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[dict]:
+        with _connect() as conn:
+            row = conn.execute("SELECT payload FROM result_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE result_cache SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                    (time.time(), cache_key),
+                )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, payload: dict, source_key: str, target_language: str,
+            whisper_model: str, summarizer_model: str) -> None:
+        data = json.dumps(payload, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, _connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO result_cache
+                   (cache_key, source_key, target_language, whisper_model, summarizer_model,
+                    payload, size_bytes, created_at, last_accessed, hit_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)""",
+                (cache_key, source_key, target_language, whisper_model, summarizer_model, data, size, now, now),
+            )
+            self.evictions += _evict_lru(conn, "result_cache", "cache_key", self.max_bytes)
+
+    def stats(self) -> dict:
+        with _connect() as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM result_cache"
+            ).fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "size_bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class StageCache:
+    """
+    Persistent cache of intermediate pipeline artifacts, so a new target language
+    for an already-processed video only pays for translation and TTS.
+
+    Stages and the parts their keys are built from:
+      transcript       (source, whisper model)
+      english_summary  (source, whisper model, summarizer model)
+      translation      (source, whisper model, summarizer model, target language)
+    """
+
+    def __init__(self, max_bytes: int = STAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with _connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stage_artifacts (
+                    artifact_key TEXT PRIMARY KEY,
+                    stage TEXT,
+                    payload TEXT,
+                    size_bytes INTEGER,
+                    created_at REAL,
+                    last_accessed REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_artifacts_lru ON stage_artifacts(last_accessed)")
+
+    @staticmethod
+    def _key(stage: str, parts) -> str:
+        raw = "|".join([stage] + [str(p) for p in parts])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, stage: str, *parts) -> Optional[dict]:
+        key = self._key(stage, parts)
+        with _connect() as conn:
+            row = conn.execute("SELECT payload FROM stage_artifacts WHERE artifact_key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE stage_artifacts SET last_accessed = ? WHERE artifact_key = ?", (time.time(), key))
+        with self._lock:
+            counter = self.misses if row is None else self.hits
+            counter[stage] = counter.get(stage, 0) + 1
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, stage: str, value: dict, *parts) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, _connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO stage_artifacts
+                   (artifact_key, stage, payload, size_bytes, created_at, last_accessed)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (self._key(stage, parts), stage, data, size, now, now),
+            )
+            self.evictions += _evict_lru(conn, "stage_artifacts", "artifact_key", self.max_bytes)
+
+    def stats(self) -> dict:
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT stage, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM stage_artifacts GROUP BY stage"
+            ).fetchall()
+        with self._lock:
+            hit_ratio = {}
+            for stage in set(self.hits) | set(self.misses):
+                lookups = self.hits.get(stage, 0) + self.misses.get(stage, 0)
+                hit_ratio[stage] = round(self.hits.get(stage, 0) / lookups, 3) if lookups else 0.0
+            return {
+                "stages": {stage: {"entries": count, "size_bytes": size} for stage, count, size in rows},
+                "max_bytes": self.max_bytes,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "evictions": self.evictions,
+                "hit_ratio": hit_ratio,
+            }
+
+
+class MetadataCache:
+    """
+    Persistent per-video metadata records keyed by YouTube id, so yt-dlp extracts
+    a video's info once and every consumer reads the same record until it is
+    older than `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: int = METADATA_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with _connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_metadata (
+                    video_id TEXT PRIMARY KEY,
+                    payload TEXT,
+                    fetched_at REAL
+                )
+            """)
+
+    def get(self, video_id: str) -> Optional[dict]:
+        if not video_id:
+            return None
+        with _connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM video_metadata WHERE video_id = ? AND fetched_at >= ?",
+                (video_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, video_id: str, metadata: dict) -> None:
+        if not video_id:
+            return
+        now = time.time()
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO video_metadata (video_id, payload, fetched_at) VALUES (?, ?, ?)",
+                (video_id, json.dumps(metadata, ensure_ascii=False), now),
+            )
+            # Expired records are never read again
+            conn.execute("DELETE FROM video_metadata WHERE fetched_at < ?", (now - self.ttl_seconds,))
+
+    def stats(self) -> dict:
+        with _connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM video_metadata").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def normalize_sentence(text: str) -> str:
+    """Canonical form used as the translation memory key (NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class TranslationMemory:
+    """
+    Persistent sentence-level translation memory keyed on (normalized sentence, src, tgt).
+    Least recently used sentences are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = TRANSLATION_MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with _connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translation_memory (
+                    tm_key TEXT PRIMARY KEY,
+                    src_lang TEXT,
+                    tgt_lang TEXT,
+                    source_text TEXT,
+                    target_text TEXT,
+                    created_at REAL,
+                    last_used REAL,
+                    use_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translation_memory_lru ON translation_memory(last_used)")
+
+    @staticmethod
+    def _key(sentence: str, src_lang: str, tgt_lang: str) -> str:
+        raw = f"{src_lang}|{tgt_lang}|{normalize_sentence(sentence)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, sentences, src_lang: str, tgt_lang: str) -> dict:
+        """Return {sentence: translation} for the sentences already in memory."""
+        keys = {self._key(s, src_lang, tgt_lang): s for s in sentences}
+        key_list = list(keys)
+        found = {}
+        with _connect() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                batch = key_list[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT tm_key, target_text FROM translation_memory WHERE tm_key IN ({placeholders})", batch
+                ).fetchall()
+                for tm_key, target_text in rows:
+                    found[keys[tm_key]] = target_text
+                if rows:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE translation_memory SET last_used = ?, use_count = use_count + 1 WHERE tm_key = ?",
+                        [(now, tm_key) for tm_key, _ in rows],
+                    )
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, pairs, src_lang: str, tgt_lang: str) -> None:
+        """Store (sentence, translation) pairs and trim the memory to its size cap."""
+        now = time.time()
+        rows = [
+            (self._key(source, src_lang, tgt_lang), src_lang, tgt_lang, normalize_sentence(source), target, now, now)
+            for source, target in pairs
+        ]
+        if not rows:
+            return
+        with self._lock, _connect() as conn:
+            conn.executemany(
+                """INSERT OR REPLACE INTO translation_memory
+                   (tm_key, src_lang, tgt_lang, source_text, target_text, created_at, last_used, use_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 0)""",
+                rows,
+            )
+            overflow = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    """DELETE FROM translation_memory WHERE tm_key IN (
+                           SELECT tm_key FROM translation_memory ORDER BY last_used ASC LIMIT ?)""",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def stats(self) -> dict:
+        with _connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,109 @@
+# circuit_breaker.py
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+
+class EndpointBreaker:
+    """
+    Circuit breaker plus rolling latency/error stats for one HTTP endpoint.
+
+    closed     requests flow normally; `failure_threshold` consecutive failures open it
+    open       requests are skipped immediately until `cooldown_seconds` have passed
+    half_open  a single probe request is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, url: str, failure_threshold: int = 3, cooldown_seconds: float = 30.0, window: int = 50):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        # Rolling window of (ok, latency seconds) for the most recent calls
+        self._results = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.time() - self.opened_at < self.cooldown_seconds:
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            # half_open: exactly one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._results.append((True, latency))
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: float):
+        with self._lock:
+            self._results.append((False, latency))
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"🔌 Circuit opened for {self.url} after {self.consecutive_failures} failures")
+                self.state = "open"
+                self.opened_at = time.time()
+            self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == "open" and time.time() - self.opened_at < self.cooldown_seconds
+
+    def _rolling(self):
+        latencies = sorted(latency for ok, latency in self._results if ok)
+        errors = sum(1 for ok, _ in self._results if not ok)
+        mean = sum(latencies) / len(latencies) if latencies else None
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None
+        error_rate = errors / len(self._results) if self._results else 0.0
+        return mean, p95, error_rate
+
+    def score(self) -> tuple:
+        """Sort key: healthy before probing, then lower error rate, then lower mean latency."""
+        with self._lock:
+            mean, _, error_rate = self._rolling()
+            # Unmeasured endpoints sort ahead of slow ones so they get tried at least once
+            return (self.state != "closed", round(error_rate, 1), mean if mean is not None else 0.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            mean, p95, error_rate = self._rolling()
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "calls": len(self._results),
+                "error_rate": round(error_rate, 3),
+                "mean_latency": round(mean, 3) if mean is not None else None,
+                "p95_latency": round(p95, 3) if p95 is not None else None,
+            }
+
+
+class EndpointPool:
+    """Breakers for a list of interchangeable endpoints, shared by every request."""
+
+    def __init__(self, urls: List[str], failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        self.breakers: Dict[str, EndpointBreaker] = {
+            url: EndpointBreaker(url, failure_threshold, cooldown_seconds) for url in urls
+        }
+
+    def candidates(self) -> List[EndpointBreaker]:
+        """Endpoints worth trying now, fastest healthy first; open circuits are skipped."""
+        available = [b for b in self.breakers.values() if not b.is_open()]
+        return sorted(available, key=lambda b: b.score())
+
+    def stats(self) -> dict:
+        return {url: breaker.stats() for url, breaker in self.breakers.items()}
@@ -0,0 +1,139 @@
+# feedback_store.py
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Append-only feedback log plus running aggregates (separate from the caches:
+# this data must never be evicted)
+FEEDBACK_DB_PATH = Path(os.getenv("FEEDBACK_DB_PATH", "feedback.db"))
+# Legacy store, imported once and then renamed to <name>.migrated
+LEGACY_FEEDBACK_PATH = Path("feedback.json")
+
+RATINGS = range(1, 6)
+
+
+@contextmanager
+def _connect(path: Path):
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+class FeedbackStore:
+    """
+    Feedback entries are only ever inserted. Every insert also bumps the counters
+    (total, rated, rating sum, per-rating histogram) in the same write
+    transaction, so stats() reads a handful of rows no matter how much feedback
+    has been collected, and concurrent writers can't lose updates.
+    """
+
+    def __init__(self, db_path: Path = FEEDBACK_DB_PATH, legacy_path: Path = LEGACY_FEEDBACK_PATH):
+        self.db_path = Path(db_path)
+        with _connect(self.db_path) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS feedback (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT,
+                        rating INTEGER,
+                        feedback TEXT,
+                        summary_id TEXT,
+                        created_at REAL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_summary ON feedback(summary_id)")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS feedback_counters (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+        self._migrate_legacy(Path(legacy_path))
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, rating: Optional[int], count: int = 1):
+        updates = [("total", count)]
+        if rating is not None:
+            updates += [("rated", count), ("rating_sum", rating * count), (f"rating:{rating}", count)]
+        conn.executemany(
+            """INSERT INTO feedback_counters (name, value) VALUES (?, ?)
+               ON CONFLICT(name) DO UPDATE SET value = value + excluded.value""",
+            updates,
+        )
+
+    def add(self, rating: Optional[int], feedback: str = "", summary_id: str = "unknown",
+            timestamp: str = None) -> int:
+        """Append one entry and update the aggregates atomically. Returns the entry id."""
+        with _connect(self.db_path) as conn:
+            # Take the write lock up front so the insert and the counters commit together
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO feedback (timestamp, rating, feedback, summary_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (timestamp or datetime.now().isoformat(), rating, feedback, summary_id, time.time()),
+                )
+                self._bump(conn, rating)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return cursor.lastrowid
+
+    def stats(self) -> dict:
+        with _connect(self.db_path) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM feedback_counters").fetchall())
+        rated = counters.get("rated", 0)
+        return {
+            "total_feedback": counters.get("total", 0),
+            "average_rating": round(counters.get("rating_sum", 0) / rated, 2) if rated else 0,
+            "rating_distribution": {str(r): counters.get(f"rating:{r}", 0) for r in RATINGS},
+        }
+
+    def _migrate_legacy(self, legacy_path: Path):
+        """Import the old feedback.json (one full JSON list) the first time the store starts."""
+        if not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {legacy_path} for migration: {e}")
+            return
+        with _connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                entries = [e for e in entries if isinstance(e, dict)] if isinstance(entries, list) else []
+                if conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0] == 0:
+                    for entry in entries:
+                        rating = parse_rating(entry.get("rating"))
+                        conn.execute(
+                            "INSERT INTO feedback (timestamp, rating, feedback, summary_id, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (entry.get("timestamp"), rating, entry.get("feedback", ""),
+                             entry.get("summary_id", "unknown"), time.time()),
+                        )
+                        self._bump(conn, rating)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + ".migrated"))
+        print(f"✅ Migrated {len(entries)} feedback entries from {legacy_path} to {self.db_path}")
+
+
+def parse_rating(value) -> Optional[int]:
+    """A 1-5 integer rating, or None for missing/invalid values."""
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating in RATINGS else None
@@ -0,0 +1,170 @@
+# jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Job:
+    """A single summarize request running (or waiting to run) on the worker pool."""
+
+    def __init__(self, job_id: str, params: dict, stages: List[str]):
+        self.id = job_id
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.current_stage = None
+        self.stages = {
+            name: {"status": "pending", "started_at": None, "finished_at": None, "progress": 0.0}
+            for name in stages
+        }
+        self.result = None
+        self.error = None
+        self.status_code = None
+        self._lock = threading.Lock()
+        # Ordered event log for streaming clients: (event id, event type, data)
+        self._events: List[Tuple[int, str, dict]] = []
+        self._events_changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event_type: str, data: dict):
+        """Append an event to the job's stream and wake up any listeners."""
+        with self._events_changed:
+            self._events.append((len(self._events) + 1, event_type, data))
+            self._events_changed.notify_all()
+
+    def iter_events(self, after: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[Tuple[int, str, dict]]]:
+        """
+        Yield events with id > `after` as they arrive, until the job has finished.
+        Yields None every `heartbeat` seconds without news so callers can keep the connection alive.
+        """
+        position = max(0, after)
+        while True:
+            with self._events_changed:
+                if position >= len(self._events) and not self.finished:
+                    self._events_changed.wait(timeout=heartbeat)
+                pending = self._events[position:]
+                done = self.finished
+            if not pending and not done:
+                yield None
+            for event in pending:
+                yield event
+            position += len(pending)
+            if done and position >= len(self._events):
+                return
+
+    def report(self, stage: str, status: str, progress: Optional[float] = None):
+        """Record a stage transition ("running" / "done" / "failed") or progress update."""
+        with self._lock:
+            info = self.stages.setdefault(
+                stage, {"status": "pending", "started_at": None, "finished_at": None, "progress": 0.0}
+            )
+            now = time.time()
+            if status == "running" and info["started_at"] is None:
+                info["started_at"] = now
+            if status in ("done", "failed"):
+                info["finished_at"] = now
+                if status == "done":
+                    info["progress"] = 1.0
+            if progress is not None:
+                info["progress"] = round(max(0.0, min(1.0, progress)), 3)
+            info["status"] = status
+            self.current_stage = stage
+            snapshot = {"stage": stage, "status": status, "progress": info["progress"]}
+        self.emit("stage", snapshot)
+
+    def progress(self) -> float:
+        with self._lock:
+            if not self.stages:
+                return 1.0 if self.status == "succeeded" else 0.0
+            return round(sum(s["progress"] for s in self.stages.values()) / len(self.stages), 3)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {name: dict(info) for name, info in self.stages.items()}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "current_stage": self.current_stage,
+            "progress": self.progress(),
+            "stages": stages,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded worker pool for pipeline jobs.
+    Submissions return immediately; at most `max_workers` pipelines run at once
+    and the rest wait in the executor queue.
+    """
+
+    def __init__(self, max_workers: int = 1, retention_seconds: int = 3600):
+        self.max_workers = max(1, max_workers)
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[dict, Job], dict], params: dict, stages: List[str]) -> Job:
+        """Queue `fn(params, job)`; its return value becomes the job result."""
+        self._prune()
+        job = Job(uuid.uuid4().hex[:12], params, stages)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, fn, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    def running_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == "running")
+
+    def _run(self, fn: Callable[[dict, Job], dict], job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+        job.emit("status", {"status": "running"})
+        try:
+            job.result = fn(job.params, job)
+            job.emit("result", {"status": "succeeded", "result_url": f"/jobs/{job.id}/result"})
+            status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status_code = getattr(e, "status_code", 500)
+            if job.current_stage:
+                job.report(job.current_stage, "failed")
+            print(f"❌ Job {job.id} failed: {e}")
+            job.emit("error", {"status": "failed", "error": job.error})
+            status = "failed"
+        # Flip to a terminal state under the event lock so streams see the final event first
+        with job._events_changed:
+            job.finished_at = time.time()
+            job.status = status
+            job._events_changed.notify_all()
+
+    def _prune(self):
+        """Drop finished jobs older than the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
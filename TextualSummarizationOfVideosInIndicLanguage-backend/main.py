@@ -1,27 +1,43 @@
 # main.py
 import os
+import re
 import time
+import shutil
+import tempfile
+import subprocess
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Tuple, List
-import json
 import warnings
 import numpy as np
 
 import requests
 import yt_dlp
-from gtts import gTTS
 from langdetect import detect
 from deep_translator import GoogleTranslator
 
+from cache import TranslationMemory, MetadataCache, normalize_sentence, extract_youtube_id
+from circuit_breaker import EndpointPool
+from tts import synthesize_sentences, resolve_audio_format, encode_audio
+from metrics import TRANSLATIONS
+
 import torch
 # New Import: Faster Whisper
 import whisper
+# Optional: speech/non-speech classifier for the voice-activity pre-pass
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
 
 # ---------- CONFIG ----------
 # Device selection: GPU if available otherwise CPU
 # Set device explicitly for Faster Whisper
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"🔁 Loading models... Using {DEVICE}")
+print(f"🔁 Models will load in the background... Using {DEVICE}")
 
 # Models (small / fast defaults). You can override via env vars.
 # We no longer need ASR_MODEL_ID for this new approach
@@ -30,9 +46,36 @@ SUMMARIZER_MODEL_ID = os.getenv("SUMMARIZER_MODEL_ID", "facebook/bart-large-cnn"
 # Optional: local cache folder inside project to avoid re-downloads
 LOCAL_HF_MODELS = Path(os.getenv("LOCAL_HF_MODELS", "hf_models"))
 
- 
-# Use faster-whisper model directly (small, medium, large, etc.)
-WHISPER_MODEL_PATH = "small"
+
+# Whisper tiers: each speed/quality name maps to a checkpoint and decoding options.
+# Requests choose one with `whisper_tier`; WHISPER_TIER sets the default.
+WHISPER_TIERS = {
+    "fast": {
+        "model": os.getenv("WHISPER_FAST_MODEL", "small"),
+        # Greedy, no temperature fallback, every window decoded independently
+        "decode": {"temperature": 0.0, "condition_on_previous_text": False},
+    },
+    "balanced": {
+        "model": os.getenv("WHISPER_BALANCED_MODEL", "medium"),
+        # whisper's defaults: greedy with temperature fallback on bad decodes
+        "decode": {},
+    },
+    "accurate": {
+        "model": os.getenv("WHISPER_ACCURATE_MODEL", "large-v3"),
+        "decode": {
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+            "condition_on_previous_text": True,
+        },
+    },
+}
+DEFAULT_WHISPER_TIER = os.getenv("WHISPER_TIER", "balanced").strip().lower()
+if DEFAULT_WHISPER_TIER not in WHISPER_TIERS:
+    print(f"⚠️ Unknown WHISPER_TIER '{DEFAULT_WHISPER_TIER}', using 'balanced'")
+    DEFAULT_WHISPER_TIER = "balanced"
+# Checkpoint loaded at startup (the default tier's); other tiers load on first use
+WHISPER_MODEL_NAME = WHISPER_TIERS[DEFAULT_WHISPER_TIER]["model"]
 from transformers import pipeline
 def _load_pipeline(task: str, model_id: str, device=0 if DEVICE == "cuda" else -1, **kwargs):
     # If LOCAL_HF_MODELS/<model_id_name> exists, load from there
@@ -46,15 +89,143 @@ def _load_pipeline(task: str, model_id: str, device=0 if DEVICE == "cuda" else -
         print(f"✅ Loading {task} model from HF: {model_id}")
         return pipeline(task, model=model_id, device=device, **kwargs)
 
-# Build summarizer pipeline
-summarizer_model = _load_pipeline("summarization", SUMMARIZER_MODEL_ID, device=0 if DEVICE == "cuda" else -1)
+# Run one tiny inference per model right after loading so the first real
+# request doesn't pay for lazy allocations
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1").strip().lower() not in ("0", "false", "no")
+# How long a request waits for a model that is still loading
+MODEL_LOAD_TIMEOUT = float(os.getenv("MODEL_LOAD_TIMEOUT", "900"))
+
+# -----------------------------
+# Deferred model loading: both models load concurrently in background threads;
+# callers block in get_summarizer() / get_whisper_model() until theirs is ready.
+_models = {}
+_model_state = {
+    name: {"ready": threading.Event(), "status": "not_started", "error": None, "load_seconds": None}
+    for name in ("summarizer", "whisper")
+}
+_model_threads_lock = threading.Lock()
+_model_threads_started = False
+
+def _load_summarizer():
+    return _load_pipeline("summarization", SUMMARIZER_MODEL_ID, device=0 if DEVICE == "cuda" else -1)
+
+def _load_whisper():
+    print(f"✅ Loading Whisper model '{WHISPER_MODEL_NAME}'...")
+    return whisper.load_model(WHISPER_MODEL_NAME, device=DEVICE)
+
+def _warm_up(name: str, model):
+    if name == "summarizer":
+        model("Warm-up run for the summarization model. " * 8, max_length=20, min_length=5, do_sample=False)
+    else:
+        with _whisper_lock(WHISPER_MODEL_NAME):
+            model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+
+def _load_model_in_background(name: str, loader):
+    state = _model_state[name]
+    state["status"] = "loading"
+    started = time.time()
+    try:
+        model = loader()
+        if MODEL_WARMUP:
+            state["status"] = "warming_up"
+            try:
+                _warm_up(name, model)
+            except Exception as e:
+                # The model itself loaded fine; the first request just pays for the lazy setup
+                print(f"⚠️ Warm-up of {name} model failed: {e}")
+        _models[name] = model
+        state["status"] = "ready"
+        state["load_seconds"] = round(time.time() - started, 2)
+        print(f"✅ {name} model ready in {state['load_seconds']}s")
+    except Exception as e:
+        state["status"] = "failed"
+        state["error"] = str(e)
+        print(f"❌ Failed to load {name} model: {e}")
+    finally:
+        state["ready"].set()
+
+def start_model_loading():
+    """Start loading both models in parallel (idempotent)."""
+    global _model_threads_started
+    with _model_threads_lock:
+        if _model_threads_started:
+            return
+        _model_threads_started = True
+    for name, loader in (("summarizer", _load_summarizer), ("whisper", _load_whisper)):
+        threading.Thread(target=_load_model_in_background, args=(name, loader),
+                         name=f"load-{name}", daemon=True).start()
+
+def _get_model(name: str):
+    start_model_loading()
+    state = _model_state[name]
+    if not state["ready"].wait(timeout=MODEL_LOAD_TIMEOUT):
+        raise Exception(f"{name} model is still loading, try again shortly")
+    if name not in _models:
+        raise Exception(f"{name} model failed to load: {state['error']}")
+    return _models[name]
+
+def get_summarizer():
+    return _get_model("summarizer")
+
+def resolve_whisper_tier(tier: str = None) -> str:
+    """Normalize a requested tier name (None → default); raises ValueError for unknown tiers."""
+    name = (tier or DEFAULT_WHISPER_TIER).strip().lower()
+    if name not in WHISPER_TIERS:
+        raise ValueError(f"Unknown whisper tier '{tier}'. Choose one of: {', '.join(WHISPER_TIERS)}")
+    return name
 
-# Load Faster Whisper model directly from the local path
-print(f"✅ Loading Faster Whisper model from local path...")
-# The WhisperModel constructor can take a local path directly
-whisper_model = whisper.load_model("medium", device=DEVICE)
+def whisper_cache_id(tier: str = None) -> str:
+    """Checkpoint + tier, used in cache keys since decoding options change the transcript too."""
+    name = resolve_whisper_tier(tier)
+    return f"{WHISPER_TIERS[name]['model']}:{name}"
 
-print("✅ Models loaded successfully.")
+_tier_models = {}
+# Guards the two dicts only; each checkpoint loads under its own lock, so a slow
+# first load (large-v3) doesn't hold up other tiers or readers of _tier_models
+_tier_models_lock = threading.Lock()
+_tier_load_locks = {}
+
+def get_whisper_model(tier: str = None):
+    model_name = WHISPER_TIERS[resolve_whisper_tier(tier)]["model"]
+    if model_name == WHISPER_MODEL_NAME:
+        return _get_model("whisper")
+    with _tier_models_lock:
+        model = _tier_models.get(model_name)
+        load_lock = _tier_load_locks.setdefault(model_name, threading.Lock())
+    if model is not None:
+        return model
+    with load_lock:
+        with _tier_models_lock:
+            model = _tier_models.get(model_name)
+        if model is None:
+            print(f"✅ Loading Whisper model '{model_name}' on first use...")
+            model = whisper.load_model(model_name, device=DEVICE)
+            with _tier_models_lock:
+                _tier_models[model_name] = model
+        return model
+
+def models_ready() -> bool:
+    return all(name in _models for name in _model_state)
+
+def model_status() -> dict:
+    return {
+        name: {"status": state["status"], "error": state["error"], "load_seconds": state["load_seconds"]}
+        for name, state in _model_state.items()
+    }
+
+def model_memory() -> dict:
+    """Bytes held by the parameters and buffers of every loaded model (summarizer, each Whisper checkpoint)."""
+    modules = {}
+    if "summarizer" in _models:
+        modules["summarizer"] = _models["summarizer"].model
+    if "whisper" in _models:
+        modules[f"whisper:{WHISPER_MODEL_NAME}"] = _models["whisper"]
+    with _tier_models_lock:
+        modules.update({f"whisper:{name}": model for name, model in _tier_models.items()})
+    return {
+        name: sum(t.numel() * t.element_size() for t in list(module.parameters()) + list(module.buffers()))
+        for name, module in modules.items()
+    }
 
 # -----------------------------
 # Bhashini settings
@@ -65,12 +236,161 @@ BHASHINI_URLS = [
     # some deployments use mapmyindia host - include as fallback (payload/response formats may differ)
     "https://bhashini-api.mapmyindia.com/translation",
 ]
+# Circuit breaker per endpoint: open after N consecutive failures, probe again after the cooldown
+BHASHINI_FAILURE_THRESHOLD = int(os.getenv("BHASHINI_FAILURE_THRESHOLD", "3"))
+BHASHINI_COOLDOWN_SECONDS = float(os.getenv("BHASHINI_COOLDOWN_SECONDS", "60"))
+bhashini_endpoints = EndpointPool(BHASHINI_URLS, BHASHINI_FAILURE_THRESHOLD, BHASHINI_COOLDOWN_SECONDS)
+# Sentences/chunks packed into one pipeline request (inputData.input list)
+BHASHINI_BATCH_MAX_ITEMS = int(os.getenv("BHASHINI_BATCH_MAX_ITEMS", "32"))
+BHASHINI_BATCH_MAX_CHARS = int(os.getenv("BHASHINI_BATCH_MAX_CHARS", "4000"))
+# Chunks translated in parallel over the shared keep-alive session
+BHASHINI_CONCURRENCY = int(os.getenv("BHASHINI_CONCURRENCY", "4"))
+
+# Sentence-level translation memory (cache.db); only misses go to Bhashini / Google
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY", "1").strip().lower() not in ("0", "false", "no")
+translation_memory = TranslationMemory()
+
+# One yt-dlp metadata record per video (cache.db, METADATA_CACHE_TTL_SECONDS), shared by
+# the downloader, the title/duration lookup and the description fallback
+video_metadata = MetadataCache()
+
+# Chunks summarized per forward pass
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))
+# Adaptive max_length is rounded up to a multiple of this many tokens, so chunks of
+# similar length share limits and therefore a batch (1 = exact per-chunk limits)
+SUMMARY_LENGTH_STEP = max(1, int(os.getenv("SUMMARY_LENGTH_STEP", "50")))
+# Optional cap on tokens per summarizer chunk (0 = fill up to the model's input limit)
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "0"))
+# Map-reduce: re-summarize the joined chunk summaries until they fit this many tokens (0 = off)
+SUMMARY_TARGET_TOKENS = int(os.getenv("SUMMARY_TARGET_TOKENS", "512"))
+SUMMARY_MAX_LEVELS = int(os.getenv("SUMMARY_MAX_LEVELS", "3"))
+# Summarizer batches run concurrently by this many threads in the map stage
+SUMMARY_MAP_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "2"))
+
+# Per-run scratch space: every pipeline run gets its own directory under here
+WORKSPACE_ROOT = Path(os.getenv("WORKSPACE_ROOT", "workspaces"))
+
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+# Window length used when transcription progress is streamed to a client
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "120"))
+
+# Voice-activity pre-pass: only speech regions are sent to Whisper. Uses the WebRTC
+# speech/non-speech classifier (webrtcvad); without it the audio is not trimmed.
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+# 0 (keeps the most audio) to 3 (drops the most non-speech)
+VAD_AGGRESSIVENESS = min(3, max(0, int(os.getenv("VAD_AGGRESSIVENESS", "2"))))
+# webrtcvad classifies 10, 20 or 30 ms frames of 16-bit PCM
+VAD_FRAME_MS = 30
+VAD_MIN_GAP_SECONDS = float(os.getenv("VAD_MIN_GAP_SECONDS", "0.6"))
+VAD_PAD_SECONDS = float(os.getenv("VAD_PAD_SECONDS", "0.2"))
+# Short silence kept between joined regions so Whisper still sees the pauses
+VAD_JOIN_SILENCE_SECONDS = 0.3
+
+# Confidence stats: Whisper's own thresholds for a failed / silent / repetitive decode
+_SEGMENT_SCORE_KEYS = ("avg_logprob", "no_speech_prob", "compression_ratio")
+LOW_CONFIDENCE_LOGPROB = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+COMPRESSION_RATIO_THRESHOLD = 2.4
+
+# Parallel CPU transcription: windows are decoded by this many worker processes,
+# each holding its own Whisper model (0/1 = off; every worker costs one model's RAM)
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "0"))
+# torch intra-op threads per worker (0 = split the machine's cores evenly)
+TRANSCRIBE_TORCH_THREADS = int(os.getenv("TRANSCRIBE_TORCH_THREADS", "0"))
+# Length of the windows handed to the workers (cut at the quietest point near each boundary)
+TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_SECONDS", "60"))
+
+# whisper installs kv-cache hooks on the shared model while decoding, so only
+# one transcription may use a given model instance at a time.
+_whisper_locks = {}
+_whisper_locks_guard = threading.Lock()
+
+def _whisper_lock(model_name: str) -> threading.Lock:
+    with _whisper_locks_guard:
+        return _whisper_locks.setdefault(model_name, threading.Lock())
+
+# -----------------------------
+# Workspaces
+def create_workspace(prefix: str = "run_") -> Path:
+    """Create an isolated scratch directory for one pipeline run."""
+    WORKSPACE_ROOT.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=WORKSPACE_ROOT))
+
+def remove_workspace(workspace) -> None:
+    if workspace:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+def cleanup_stale_workspaces(max_age_seconds: int = 6 * 3600) -> int:
+    """Remove workspaces left behind by crashed runs. Returns how many were removed."""
+    if not WORKSPACE_ROOT.exists():
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    for path in WORKSPACE_ROOT.iterdir():
+        if path.is_dir() and path.stat().st_mtime < cutoff:
+            remove_workspace(path)
+            removed += 1
+    return removed
 
 # -----------------------------
 # Helpers
 def chunk_text(text: str, max_chars: int = 3500) -> List[str]:
     return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
 
+# Sentence ends: Latin punctuation plus the Devanagari danda / double danda
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?।॥])\s+")
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END_RE.split(text or "") if s.strip()]
+
+def model_input_limit(summarizer) -> int:
+    """Usable input tokens for a summarization pipeline (model limit minus special tokens)."""
+    tokenizer = summarizer.tokenizer
+    limit = tokenizer.model_max_length
+    max_positions = getattr(summarizer.model.config, "max_position_embeddings", None)
+    # Tokenizers without a configured limit report a huge sentinel value
+    if not limit or limit > 100_000:
+        limit = max_positions or 1024
+    elif max_positions:
+        limit = min(limit, max_positions)
+    return limit - tokenizer.num_special_tokens_to_add()
+
+def chunk_text_by_tokens(text: str, tokenizer, max_tokens: int) -> List[str]:
+    """
+    Split on sentence boundaries and pack sentences greedily into chunks of at most
+    `max_tokens` tokens, as measured by the model's own tokenizer. Sentences that are
+    longer than the limit on their own are split on token boundaries.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+
+    chunks, current, current_tokens = [], [], 0
+    for sentence, ids in zip(sentences, token_ids):
+        # +1 accounts for the space joining this sentence to the previous one
+        if current and current_tokens + len(ids) + 1 > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        if len(ids) > max_tokens:
+            for i in range(0, len(ids), max_tokens):
+                chunks.append(tokenizer.decode(ids[i:i + max_tokens]).strip())
+            continue
+        current.append(sentence)
+        current_tokens += len(ids) + (1 if current_tokens else 0)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def chunk_for_summarizer(text: str) -> List[str]:
+    """Token-packed, sentence-aligned chunks sized to the loaded summarizer's input limit."""
+    summarizer = get_summarizer()
+    max_tokens = model_input_limit(summarizer)
+    if SUMMARY_CHUNK_TOKENS > 0:
+        max_tokens = min(max_tokens, SUMMARY_CHUNK_TOKENS)
+    return chunk_text_by_tokens(text, summarizer.tokenizer, max_tokens)
+
 def detect_language(text: str) -> str:
     try:
         return detect(text)
@@ -103,23 +423,20 @@ def convert_numbers_to_local(text: str, target_lang: str) -> str:
     return converted_text
 
 # -----------------------------
-# YouTube → WAV
-def download_youtube_audio(url: str) -> str:
+# YouTube → native audio stream (decoded once, straight to 16 kHz float32, by decode_audio)
+def download_youtube_audio(url: str, workspace: Path) -> Tuple[str, dict]:
+    """
+    Download the audio track of `url` into `workspace` as-is (usually Opus/WebM or
+    AAC/M4A, no re-encode). Returns (audio path, metadata record); the record
+    yt-dlp extracted on the way is also stored in `video_metadata`.
+    """
     try:
-        download_dir = Path("downloads")
-        download_dir.mkdir(exist_ok=True)
+        workspace = Path(workspace)
 
         # ENHANCED: Better yt-dlp options to avoid bot detection
         ydl_opts = {
             "format": "bestaudio/best",
-            "outtmpl": str(download_dir / "%(id)s.%(ext)s"),
-            "postprocessors": [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "wav",
-                    "preferredquality": "192",
-                }
-            ],
+            "outtmpl": str(workspace / "%(id)s.%(ext)s"),
             "quiet": False,
             "noplaylist": True,
             "extract_flat": False,
@@ -147,38 +464,22 @@ def download_youtube_audio(url: str) -> str:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=True)
             video_id = info.get("id")
-            audio_path = download_dir / f"{video_id}.wav"
-            
-            # Store video info for later use if needed
-            video_info = {
-                "id": video_id,
-                "title": info.get("title", ""),
-                "description": info.get("description", ""),
-                "duration": info.get("duration", 0),
-            }
-            
-            # Save video info to a file for potential use
-            info_path = download_dir / f"{video_id}_info.json"
-            with open(info_path, "w", encoding="utf-8") as f:
-                json.dump(video_info, f, ensure_ascii=False, indent=2)
-
-        timeout = 30
-        while timeout > 0 and not audio_path.exists():
-            time.sleep(1)
-            timeout -= 1
+            # Where yt-dlp actually wrote the stream (extension depends on the format picked)
+            downloads = info.get("requested_downloads") or []
+            audio_path = Path(downloads[0]["filepath"] if downloads else ydl.prepare_filename(info))
+            metadata = _metadata_from_info(info)
+            # Cache the video info so nothing else has to extract it again (best effort)
+            try:
+                video_metadata.put(video_id, metadata)
+            except Exception as e:
+                print(f"⚠️ Metadata cache write failed: {e}")
 
         if not audio_path.exists():
             raise Exception("Audio file not found after download")
 
-        final_audio_dir = Path("audio_files")
-        final_audio_dir.mkdir(exist_ok=True)
-        final_audio_path = final_audio_dir / "audio.wav"
-
-        if final_audio_path.exists():
-            final_audio_path.unlink()
-
+        final_audio_path = workspace / f"audio{audio_path.suffix}"
         os.replace(audio_path, final_audio_path)
-        return str(final_audio_path)
+        return str(final_audio_path), metadata
 
     except Exception as e:
         error_msg = str(e)
@@ -191,29 +492,43 @@ def download_youtube_audio(url: str) -> str:
         else:
             raise Exception(f"YouTube download failed: {error_msg}")
 
-def get_youtube_description(video_url: str) -> str:
-    """Extract YouTube video description"""
+def _metadata_from_info(info: dict) -> dict:
+    return {
+        "id": info.get("id"),
+        "title": info.get("title", ""),
+        "description": info.get("description", ""),
+        "duration": info.get("duration", 0),
+    }
+
+def get_video_metadata(video_url: str) -> dict:
+    """
+    Metadata record for a YouTube URL: served from `video_metadata` when fresh,
+    otherwise extracted once with yt-dlp (no download) and cached.
+    """
+    video_id = extract_youtube_id(video_url)
+    # Cache failures (e.g. a locked cache.db) only cost an extra extraction
     try:
-        download_dir = Path("downloads")
-        video_id = video_url.split("v=")[-1].split("&")[0]
-        info_path = download_dir / f"{video_id}_info.json"
-        
-        if info_path.exists():
-            with open(info_path, "r", encoding="utf-8") as f:
-                video_info = json.load(f)
-                return video_info.get("description", "")
-        else:
-            # If info file doesn't exist, try to get info without downloading
-            ydl_opts = {
-                "quiet": True,
-                "extract_flat": True,
-                "skip_download": True,
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                return info.get("description", "")
-                
+        cached = video_metadata.get(video_id)
+    except Exception as e:
+        print(f"⚠️ Metadata cache read failed: {e}")
+        cached = None
+    if cached is not None:
+        return cached
+    ydl_opts = {"quiet": True, "skip_download": True, "noplaylist": True}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+    metadata = _metadata_from_info(info)
+    try:
+        video_metadata.put(metadata["id"] or video_id, metadata)
+    except Exception as e:
+        print(f"⚠️ Metadata cache write failed: {e}")
+    return metadata
+
+def get_youtube_description(video_url: str, metadata: dict = None) -> str:
+    """Extract YouTube video description (from `metadata` when the caller already has it)"""
+    try:
+        metadata = metadata or get_video_metadata(video_url)
+        return metadata.get("description") or ""
     except Exception as e:
         print(f"⚠️ Failed to get YouTube description: {e}")
         return ""
@@ -254,33 +569,362 @@ def clean_youtube_description(description: str) -> str:
 
 # -----------------------------
 # Transcription (Updated for Faster Whisper)
-def transcribe_audio(verbose: bool = False) -> str:
+def decode_audio(path, sample_rate: int = None) -> np.ndarray:
+    """
+    Decode any audio or video file to mono float32 at Whisper's sample rate in a
+    single ffmpeg pass, read straight from its stdout (no intermediate WAV).
+    """
+    sample_rate = sample_rate or SAMPLE_RATE
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", str(path),
+        "-vn", "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "-",
+    ]
     try:
-        audio_path = Path("audio_files") / "audio.wav"
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise Exception("ffmpeg is not installed or not on PATH")
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()[-300:]}")
+    # frombuffer views the (read-only) bytes; copy so whisper/torch get a writable array
+    return np.frombuffer(out, dtype=np.float32).copy()
+
+def transcribe_audio(audio_path, verbose: bool = False, out_dir=None, tier: str = None) -> str:
+    return transcribe_audio_segments(audio_path, verbose=verbose, out_dir=out_dir, tier=tier)["text"]
+
+def _segments_from_result(result: dict, offset: float = 0.0) -> List[dict]:
+    segments = []
+    for segment in result["segments"]:
+        item = {
+            "start": round(float(segment["start"]) + offset, 2),
+            "end": round(float(segment["end"]) + offset, 2),
+            "text": segment["text"].strip(),
+        }
+        # Whisper's own per-segment decoding scores, kept for the confidence stats
+        for key in _SEGMENT_SCORE_KEYS:
+            if segment.get(key) is not None:
+                item[key] = round(float(segment[key]), 4)
+        segments.append(item)
+    return segments
+
+def transcription_confidence(segments: List[dict]) -> dict:
+    """
+    Whole-file confidence from Whisper's segment scores, computed in one vectorized pass.
+    Each segment also gets a "confidence" (exp of its average token log-probability).
+    Shares are weighted by segment duration; segments without scores are skipped.
+    """
+    stats = {
+        "segments": len(segments),
+        "word_count": sum(len(s["text"].split()) for s in segments),
+        "confidence_score": None,
+        "min_confidence": None,
+        "p10_confidence": None,
+        "mean_avg_logprob": None,
+        "low_confidence_ratio": None,
+        "mean_no_speech_prob": None,
+        "no_speech_ratio": None,
+        "repetition_ratio": None,
+        "audio_quality": None,
+    }
+    if not segments:
+        return stats
+
+    def column(key):
+        return np.array([s.get(key, np.nan) for s in segments], dtype=np.float64)
+
+    logprob, no_speech, compression = column("avg_logprob"), column("no_speech_prob"), column("compression_ratio")
+    durations = np.maximum(column("end") - column("start"), 0.01)
+    scored = ~np.isnan(logprob)
+    if not scored.any():
+        return stats
+
+    confidence = np.clip(np.exp(logprob), 0.0, 1.0)
+    for segment, value in zip(segments, confidence):
+        if not np.isnan(value):
+            segment["confidence"] = round(float(value), 3)
+
+    weights = durations[scored]
+    stats.update({
+        "confidence_score": round(float(np.average(confidence[scored], weights=weights)), 3),
+        "min_confidence": round(float(confidence[scored].min()), 3),
+        "p10_confidence": round(float(np.percentile(confidence[scored], 10)), 3),
+        "mean_avg_logprob": round(float(np.average(logprob[scored], weights=weights)), 3),
+        "low_confidence_ratio": round(float(weights[logprob[scored] < LOW_CONFIDENCE_LOGPROB].sum() / weights.sum()), 3),
+    })
+    if not np.isnan(no_speech).all():
+        has = ~np.isnan(no_speech)
+        mean_no_speech = float(np.average(no_speech[has], weights=durations[has]))
+        stats["mean_no_speech_prob"] = round(mean_no_speech, 3)
+        stats["no_speech_ratio"] = round(float((no_speech[has] > NO_SPEECH_THRESHOLD).mean()), 3)
+        # Clear speech: the decoder is sure it's speech and sure of the words
+        stats["audio_quality"] = round((1.0 - mean_no_speech) * stats["confidence_score"], 3)
+    if not np.isnan(compression).all():
+        has = ~np.isnan(compression)
+        stats["repetition_ratio"] = round(float((compression[has] > COMPRESSION_RATIO_THRESHOLD).mean()), 3)
+    return stats
+
+def _split_windows(audio: np.ndarray, window_seconds: float, search_seconds: float = 5.0) -> List[Tuple[int, int]]:
+    """
+    Split audio into ~window_seconds pieces (sample ranges), cutting at the quietest
+    100 ms frame in the last few seconds before each boundary so words are not split.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    frame = SAMPLE_RATE // 10
+    search = int(search_seconds * SAMPLE_RATE)
+    windows = []
+    start = 0
+    while len(audio) - start > window:
+        target = start + window
+        lo = max(start + frame, target - search)
+        frames = (target - lo) // frame
+        if frames > 0:
+            energy = np.square(audio[lo:lo + frames * frame].reshape(frames, frame)).mean(axis=1)
+            cut = lo + int(np.argmin(energy)) * frame + frame // 2
+        else:
+            cut = target
+        windows.append((start, cut))
+        start = cut
+    if start < len(audio):
+        windows.append((start, len(audio)))
+    return windows
+
+def _transcribe_streaming(audio: np.ndarray, tier: str, on_segment=None, on_progress=None) -> List[dict]:
+    """
+    Transcribe window by window so segments and progress are reported while the
+    file is still being processed. The tail of each window's text is passed as the
+    prompt for the next one to keep context across the cut.
+    """
+    model = get_whisper_model(tier)
+    model_name, decode = WHISPER_TIERS[tier]["model"], WHISPER_TIERS[tier]["decode"]
+    windows = _split_windows(audio, STREAM_WINDOW_SECONDS)
+    total = max(1, len(audio))
+    segments = []
+    prompt = None
+    for i, (start, end) in enumerate(windows, 1):
+        print(f"   Window {i}/{len(windows)} ({start / SAMPLE_RATE:.0f}s → {end / SAMPLE_RATE:.0f}s)")
+        with _whisper_lock(model_name):
+            result = model.transcribe(audio[start:end], language="en", initial_prompt=prompt, **decode)
+        window_segments = _segments_from_result(result, offset=start / SAMPLE_RATE)
+        for segment in window_segments:
+            if on_segment:
+                on_segment(segment)
+        segments.extend(window_segments)
+        window_text = " ".join(s["text"] for s in window_segments).strip()
+        if window_text:
+            prompt = window_text[-200:]
+        if on_progress:
+            on_progress(end / total)
+    return segments
+
+# -----------------------------
+# Parallel transcription: a spawn-based process pool, one Whisper model per worker
+_transcribe_pools = {}
+_transcribe_pool_lock = threading.Lock()
+_worker_model = None
+
+def _init_transcribe_worker(model_name: str, torch_threads: int):
+    global _worker_model
+    torch.set_num_threads(torch_threads)
+    _worker_model = whisper.load_model(model_name, device="cpu")
+
+def _transcribe_window(audio: np.ndarray, decode: dict) -> List[dict]:
+    # Runs inside a worker process; only the plain segments travel back
+    return _segments_from_result(_worker_model.transcribe(audio, language="en", **decode))
+
+def parallel_transcription_enabled() -> bool:
+    return TRANSCRIBE_WORKERS > 1 and DEVICE == "cpu"
+
+def _get_transcribe_pool(model_name: str) -> ProcessPoolExecutor:
+    """Worker pool for one checkpoint (a pool per tier model that has been used)."""
+    with _transcribe_pool_lock:
+        if model_name not in _transcribe_pools:
+            threads = TRANSCRIBE_TORCH_THREADS or max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS)
+            print(f"🧵 Starting {TRANSCRIBE_WORKERS} '{model_name}' transcription workers ({threads} torch threads each)")
+            # spawn, not fork: the parent already runs torch/OpenMP threads
+            _transcribe_pools[model_name] = ProcessPoolExecutor(
+                max_workers=TRANSCRIBE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_transcribe_worker,
+                initargs=(model_name, threads),
+            )
+        return _transcribe_pools[model_name]
+
+def _reset_transcribe_pool(model_name: str):
+    with _transcribe_pool_lock:
+        pool = _transcribe_pools.pop(model_name, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _transcribe_parallel(audio: np.ndarray, tier: str, on_segment=None, on_progress=None) -> List[dict]:
+    """
+    Transcribe silence-split windows concurrently in the worker pool and stitch
+    the segments back in order. Segments are reported as soon as every window
+    before them has finished, so callbacks still see them in timeline order.
+    """
+    model_name, decode = WHISPER_TIERS[tier]["model"], WHISPER_TIERS[tier]["decode"]
+    windows = _split_windows(audio, TRANSCRIBE_WINDOW_SECONDS)
+    pool = _get_transcribe_pool(model_name)
+    futures = {
+        pool.submit(_transcribe_window, audio[start:end], decode): i
+        for i, (start, end) in enumerate(windows)
+    }
+    results = [None] * len(windows)
+    next_index = 0
+    done_samples = 0
+    total = max(1, len(audio))
+    for future in as_completed(futures):
+        i = futures[future]
+        start, end = windows[i]
+        try:
+            window_segments = future.result()
+        except BrokenProcessPool:
+            # A worker died (usually out of memory); start a fresh pool on the next request
+            _reset_transcribe_pool(model_name)
+            raise Exception("a transcription worker process crashed")
+        results[i] = _segments_from_result({"segments": window_segments}, offset=start / SAMPLE_RATE)
+        done_samples += end - start
+        print(f"   Window {i + 1}/{len(windows)} done ({start / SAMPLE_RATE:.0f}s → {end / SAMPLE_RATE:.0f}s)")
+        while next_index < len(windows) and results[next_index] is not None:
+            if on_segment:
+                for segment in results[next_index]:
+                    on_segment(segment)
+            next_index += 1
+        if on_progress:
+            on_progress(done_samples / total)
+    return [segment for window_segments in results for segment in window_segments]
+
+def _speech_frames(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """Sample ranges of consecutive VAD_FRAME_MS frames that webrtcvad classifies as speech."""
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    frame = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    intervals, run_start = [], None
+    for start in range(0, len(pcm) - frame + 1, frame):
+        if vad.is_speech(pcm[start:start + frame].tobytes(), SAMPLE_RATE):
+            if run_start is None:
+                run_start = start
+        elif run_start is not None:
+            intervals.append((run_start, start))
+            run_start = None
+    if run_start is not None:
+        intervals.append((run_start, len(pcm)))
+    return intervals
+
+def detect_speech_regions(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Voice activity detection (speech vs. silence, music, applause). Returns padded
+    sample ranges of the speech; pauses shorter than VAD_MIN_GAP_SECONDS are not cut.
+    """
+    if len(audio) == 0:
+        return []
+    intervals = _speech_frames(audio)
+    pad = int(VAD_PAD_SECONDS * SAMPLE_RATE)
+    min_gap = int(VAD_MIN_GAP_SECONDS * SAMPLE_RATE)
+    regions = []
+    for start, end in intervals:
+        start, end = max(0, int(start) - pad), min(len(audio), int(end) + pad)
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+    return [(start, end) for start, end in regions]
+
+def trim_to_speech(audio: np.ndarray) -> Tuple[np.ndarray, List[Tuple[float, float, float]]]:
+    """
+    Join the speech regions (separated by a short silence) into one shorter array.
+    Returns (speech_audio, timeline) where each timeline entry is
+    (start in trimmed audio, start in original audio, length), all in seconds.
+    """
+    regions = detect_speech_regions(audio)
+    if not regions:
+        return np.zeros(0, dtype=np.float32), []
+    joiner = np.zeros(int(VAD_JOIN_SILENCE_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    pieces, timeline, position = [], [], 0
+    for start, end in regions:
+        if pieces:
+            pieces.append(joiner)
+            position += len(joiner)
+        pieces.append(audio[start:end])
+        timeline.append((position / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE))
+        position += end - start
+    return np.concatenate(pieces).astype(np.float32), timeline
+
+def restore_timestamp(t: float, timeline: List[Tuple[float, float, float]]) -> float:
+    """Map a time in the trimmed audio back to the original audio."""
+    if not timeline:
+        return t
+    starts = [entry[0] for entry in timeline]
+    k = max(0, int(np.searchsorted(starts, t, side="right")) - 1)
+    trimmed_start, original_start, length = timeline[k]
+    # Times inside a joining silence snap to the end of the region before it
+    return round(original_start + min(max(0.0, t - trimmed_start), length), 2)
+
+def transcribe_audio_segments(audio_path, verbose: bool = False, out_dir=None,
+                              on_segment=None, on_progress=None, tier: str = None) -> dict:
+    """
+    Returns {"text": full transcript, "segments": [{"start", "end", "text", scores...}, ...],
+             "confidence": transcription_confidence(segments), ...}
+    With `on_segment` / `on_progress` callbacks the audio is transcribed in windows
+    and each segment is reported as soon as it is decoded. With TRANSCRIBE_WORKERS
+    set (CPU only), windows are decoded in parallel worker processes.
+    `tier` picks the Whisper model and decoding options (see WHISPER_TIERS).
+    """
+    try:
+        audio_path = Path(audio_path)
         if not audio_path.exists():
             raise Exception("Audio file not found")
         
-        # Using Faster Whisper for transcription
-        print("🚀 Starting Faster Whisper transcription...")
-        result = whisper_model.transcribe(str(audio_path), language="en")
-        
-        full_text = ""
-        for segment in result["segments"]:
-            full_text += segment["text"] + " "
+        tier = resolve_whisper_tier(tier)
+        print(f"🚀 Starting Whisper transcription ({tier}: {WHISPER_TIERS[tier]['model']})...")
+        audio = decode_audio(audio_path)
+        audio_seconds = len(audio) / SAMPLE_RATE
+        timeline = None
+        if VAD_ENABLED and webrtcvad is not None:
+            audio, timeline = trim_to_speech(audio)
+            print(f"🎙️ Speech: {len(audio) / SAMPLE_RATE:.1f}s of {audio_seconds:.1f}s ({len(timeline)} regions)")
+        elif VAD_ENABLED:
+            print("⚠️ webrtcvad is not installed, transcribing without voice-activity trimming")
+
+        def restore(segment):
+            if timeline:
+                segment["start"] = restore_timestamp(segment["start"], timeline)
+                segment["end"] = restore_timestamp(segment["end"], timeline)
+            return segment
+
+        emit = (lambda segment: on_segment(restore(segment))) if on_segment else None
+        if len(audio) == 0:
+            segments = []
+        elif parallel_transcription_enabled() and len(audio) > TRANSCRIBE_WINDOW_SECONDS * SAMPLE_RATE:
+            segments = _transcribe_parallel(audio, tier, emit, on_progress)
+        elif on_segment is None and on_progress is None:
+            model = get_whisper_model(tier)
+            with _whisper_lock(WHISPER_TIERS[tier]["model"]):
+                result = model.transcribe(audio, language="en", **WHISPER_TIERS[tier]["decode"])
+            segments = _segments_from_result(result)
+        else:
+            segments = _transcribe_streaming(audio, tier, emit, on_progress)
+        if on_segment is None:
+            # (emitted segments were already mapped back on the way out)
+            segments = [restore(s) for s in segments]
         
-        text = full_text.strip()
+        text = " ".join(s["text"] for s in segments if s["text"]).strip()
         
         if verbose:
             print(f"📄 Transcription language: en")
             print(f"📄 Transcription length: {len(text)} characters")
             print(f"📄 Transcription preview: {text[:200]}...")
 
-        out_dir = Path("file")
+        out_dir = Path(out_dir) if out_dir else audio_path.parent
         out_dir.mkdir(exist_ok=True)
         with open(out_dir / "transcript.txt", "w", encoding="utf-8") as f:
             f.write(text)
 
-        return text
+        return {
+            "text": text,
+            "segments": segments,
+            "confidence": transcription_confidence(segments),
+            "audio_seconds": round(audio_seconds, 2),
+            "speech_seconds": round(len(audio) / SAMPLE_RATE, 2),
+        }
         
     except Exception as e:
         print(f"❌ Transcription error details: {str(e)}")
@@ -288,13 +932,32 @@ def transcribe_audio(verbose: bool = False) -> str:
 
 # -----------------------------
 # Translation: Bhashini primary, GoogleTranslator fallback
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def _get_http_session() -> requests.Session:
+    """Shared keep-alive session so concurrent chunk requests reuse TCP/TLS connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=len(BHASHINI_URLS),
+                pool_maxsize=max(4, BHASHINI_CONCURRENCY * 2),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
 def _try_bhashini_request(url: str, payload: dict, headers: dict, timeout: int = 60):
     # Single attempt wrapper
-    r = requests.post(url, json=payload, headers=headers, timeout=timeout)
+    r = _get_http_session().post(url, json=payload, headers=headers, timeout=timeout)
     r.raise_for_status()
     return r.json()
 
-def _parse_bhashini_response(data):
+def _parse_bhashini_outputs(data) -> List[str]:
+    """Translated outputs in request order (one per inputData.input entry)."""
     # Try multiple possible response layouts
     try:
         if isinstance(data, dict):
@@ -310,7 +973,7 @@ def _parse_bhashini_response(data):
                                 elif "translatedText" in output:
                                     outputs.append(output["translatedText"])
                 if outputs:
-                    return " ".join(outputs).strip()
+                    return [o.strip() for o in outputs]
             
             # Fallback to direct output
             if "output" in data and isinstance(data["output"], list):
@@ -322,116 +985,365 @@ def _parse_bhashini_response(data):
                         elif "translatedText" in item:
                             outputs.append(item["translatedText"])
                 if outputs:
-                    return " ".join(outputs).strip()
+                    return [o.strip() for o in outputs]
             
             if "translatedText" in data:
-                return data["translatedText"]
+                return [data["translatedText"]]
                 
     except Exception as e:
         print(f"⚠️ Bhashini response parsing error: {e}")
     
-    return ""
+    return []
 
-def _bhashini_translate(text: str, src_lang: str, tgt_lang: str) -> str:
-    """
-    Try Bhashini endpoints with retries and simple parsing.
-    """
-    if not BHASHINI_API_KEY:
-        raise RuntimeError("Missing BHASHINI_API_KEY")
+def _parse_bhashini_response(data):
+    return " ".join(_parse_bhashini_outputs(data)).strip()
 
-    headers = {
+def _bhashini_payload(segments: List[str], src_lang: str, tgt_lang: str) -> dict:
+    # payload matching Dhruva pipeline API
+    return {
+        "pipelineTasks": [
+            {
+                "taskType": "translation",
+                "config": {
+                    "language": {
+                        "sourceLanguage": src_lang,
+                        "targetLanguage": tgt_lang,
+                    }
+                },
+            }
+        ],
+        "inputData": {"input": [{"source": segment} for segment in segments]},
+    }
+
+def _bhashini_headers() -> dict:
+    return {
         "Authorization": BHASHINI_API_KEY,
         "Content-Type": "application/json",
     }
 
-    chunks = chunk_text(text, max_chars=2000)  # Reduced chunk size for reliability
-    all_translations = []
-
-    for chunk in chunks:
-        # payload matching Dhruva pipeline API
-        payload_pipeline = {
-            "pipelineTasks": [
-                {
-                    "taskType": "translation",
-                    "config": {
-                        "language": {
-                            "sourceLanguage": src_lang,
-                            "targetLanguage": tgt_lang,
-                        }
-                    },
-                }
-            ],
-            "inputData": {"input": [{"source": chunk}]},
-        }
+def _bhashini_translate_chunk(chunk: str, src_lang: str, tgt_lang: str, headers: dict) -> str:
+    """Translate one chunk via Bhashini, falling back to Google (then the original) for that chunk."""
+    payload_pipeline = _bhashini_payload([chunk], src_lang, tgt_lang)
 
-        last_err = None
-        translated = False
-        
-        for base_url in BHASHINI_URLS:
-            for attempt in range(1, 4):  # 3 attempts per URL
-                try:
-                    print(f"➡️ Bhashini try: {base_url} attempt {attempt}")
-                    resp = _try_bhashini_request(base_url, payload_pipeline, headers, timeout=30)
-                    translated_text = _parse_bhashini_response(resp)
+    # Shared breakers: endpoints with an open circuit are skipped without a request,
+    # the fastest healthy endpoint is tried first
+    for breaker in bhashini_endpoints.candidates():
+        base_url = breaker.url
+        for attempt in range(1, 4):  # 3 attempts per URL
+            if not breaker.allow_request():
+                break
+            started = time.time()
+            try:
+                print(f"➡️ Bhashini try: {base_url} attempt {attempt}")
+                resp = _try_bhashini_request(base_url, payload_pipeline, headers, timeout=30)
+                translated_text = _parse_bhashini_response(resp)
+                
+                # Minimum length check (scaled down for short sentences)
+                if translated_text and len(translated_text) >= min(10, len(chunk) // 2):
+                    breaker.record_success(time.time() - started)
+                    TRANSLATIONS.inc(provider="bhashini")
+                    return translated_text
+                breaker.record_failure(time.time() - started)
                     
-                    if translated_text and len(translated_text) > 10:  # Minimum length check
-                        all_translations.append(translated_text)
-                        translated = True
-                        break
-                        
-                except Exception as e:
-                    last_err = e
-                    time.sleep(1.5 * attempt)
-            
-            if translated:
+            except Exception:
+                breaker.record_failure(time.time() - started)
+                if breaker.is_open():
+                    break
+                time.sleep(1.5 * attempt)
+
+    print(f"⚠️ Bhashini failed for chunk, using Google fallback")
+    try:
+        translated_text = GoogleTranslator(source=src_lang, target=tgt_lang).translate(chunk)
+        TRANSLATIONS.inc(provider="google")
+        return translated_text
+    except Exception:
+        TRANSLATIONS.inc(provider="failed")
+        return chunk  # Keep original if all fails
+
+def _pack_batches(segments: List[str], max_items: int, max_chars: int) -> List[List[int]]:
+    """Group consecutive segment indices into batches bounded by item count and total characters."""
+    batches, current, current_chars = [], [], 0
+    for index, segment in enumerate(segments):
+        if current and (len(current) >= max_items or current_chars + len(segment) > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(index)
+        current_chars += len(segment)
+    if current:
+        batches.append(current)
+    return batches
+
+def _bhashini_request_batch(segments: List[str], src_lang: str, tgt_lang: str, headers: dict):
+    """
+    Translate several segments in one pipeline request. Outputs are mapped back to
+    inputs by position; returns None if no endpoint returned one output per input.
+    """
+    payload_pipeline = _bhashini_payload(segments, src_lang, tgt_lang)
+    for breaker in bhashini_endpoints.candidates():
+        base_url = breaker.url
+        for attempt in range(1, 3):  # 2 attempts per URL, then per-segment fallback
+            if not breaker.allow_request():
                 break
-        
-        if not translated:
-            print(f"⚠️ Bhashini failed for chunk, using Google fallback")
+            started = time.time()
             try:
-                google_translation = GoogleTranslator(source=src_lang, target=tgt_lang).translate(chunk)
-                all_translations.append(google_translation)
+                print(f"➡️ Bhashini batch of {len(segments)}: {base_url} attempt {attempt}")
+                resp = _try_bhashini_request(base_url, payload_pipeline, headers, timeout=60)
+                # The endpoint answered, so it counts as healthy even if the layout doesn't fit
+                breaker.record_success(time.time() - started)
+                outputs = _parse_bhashini_outputs(resp)
+                if len(outputs) == len(segments) and all(outputs):
+                    TRANSLATIONS.inc(len(outputs), provider="bhashini")
+                    return outputs
+                print(f"⚠️ Bhashini batch returned {len(outputs)} outputs for {len(segments)} inputs")
+                break
             except Exception:
-                all_translations.append(chunk)  # Keep original if all fails
+                breaker.record_failure(time.time() - started)
+                if breaker.is_open():
+                    break
+                time.sleep(1.5 * attempt)
+    return None
+
+def _bhashini_translate_many(segments: List[str], src_lang: str, tgt_lang: str) -> List[str]:
+    """
+    Translate a list of segments, packing up to BHASHINI_BATCH_MAX_ITEMS segments
+    (BHASHINI_BATCH_MAX_CHARS characters) into each request. Batches run concurrently;
+    a batch that can't be mapped back falls back to one request per segment.
+    """
+    if not BHASHINI_API_KEY:
+        raise RuntimeError("Missing BHASHINI_API_KEY")
 
-    return " ".join(all_translations).strip()
+    headers = _bhashini_headers()
+    results = [None] * len(segments)
+    batches = _pack_batches(segments, BHASHINI_BATCH_MAX_ITEMS, BHASHINI_BATCH_MAX_CHARS)
 
-def translate_text(text: str, src_lang: str, tgt_lang: str) -> str:
+    def run(batch):
+        batch_segments = [segments[i] for i in batch]
+        outputs = None
+        if len(batch) > 1:
+            outputs = _bhashini_request_batch(batch_segments, src_lang, tgt_lang, headers)
+        if outputs is None:
+            outputs = [_bhashini_translate_chunk(s, src_lang, tgt_lang, headers) for s in batch_segments]
+        return batch, outputs
+
+    workers = max(1, min(BHASHINI_CONCURRENCY, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bhashini") as executor:
+        for batch, outputs in executor.map(run, batches):
+            for i, translated in zip(batch, outputs):
+                results[i] = translated
+    return results
+
+def _bhashini_translate(text: str, src_lang: str, tgt_lang: str) -> str:
     """
-    Primary: Bhashini → Fallback: GoogleTranslator
-    Always returns a string. If all fail, returns the original text.
+    Try Bhashini endpoints with retries and simple parsing.
+    Chunks are batched and translated concurrently, then joined in their original order.
     """
+    chunks = chunk_text(text, max_chars=2000)  # Reduced chunk size for reliability
+    return " ".join(_bhashini_translate_many(chunks, src_lang, tgt_lang)).strip()
+
+def _translate_uncached(text: str, src_lang: str, tgt_lang: str):
+    """Bhashini → GoogleTranslator for one piece of text. Returns None if both fail."""
     try:
-        print(f"🌐 Translating: {src_lang} → {tgt_lang} ({len(text)} chars)")
-        translated_text = _bhashini_translate(text, src_lang, tgt_lang)
-        
-        # Convert numbers to target language numerals
-        if tgt_lang != "en":
-            translated_text = convert_numbers_to_local(translated_text, tgt_lang)
-            
-        return translated_text
-        
+        return _bhashini_translate(text, src_lang, tgt_lang)
     except Exception as e:
         print(f"⚠️ Bhashini translation failed: {e}. Falling back to GoogleTranslator.")
         try:
             translated_text = GoogleTranslator(source=src_lang, target=tgt_lang).translate(text)
-            
-            # Convert numbers to target language numerals
-            if tgt_lang != "en":
-                translated_text = convert_numbers_to_local(translated_text, tgt_lang)
-                
+            TRANSLATIONS.inc(provider="google")
             return translated_text
-            
         except Exception as ge:
-            print(f"❌ GoogleTranslator failed: {ge}. Returning original text.")
+            print(f"❌ GoogleTranslator failed: {ge}.")
+            TRANSLATIONS.inc(provider="failed")
+            return None
+
+def _translate_segments(segments: List[str], src_lang: str, tgt_lang: str) -> List[str]:
+    """Positional translations for many segments; None where every translator failed."""
+    try:
+        return _bhashini_translate_many(segments, src_lang, tgt_lang)
+    except Exception as e:
+        print(f"⚠️ Bhashini translation failed: {e}. Falling back to GoogleTranslator.")
+
+    def google(segment):
+        try:
+            translated_text = GoogleTranslator(source=src_lang, target=tgt_lang).translate(segment)
+            TRANSLATIONS.inc(provider="google")
+            return translated_text
+        except Exception as ge:
+            print(f"❌ GoogleTranslator failed: {ge}.")
+            TRANSLATIONS.inc(provider="failed")
+            return None
+
+    workers = max(1, min(BHASHINI_CONCURRENCY, len(segments)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate") as executor:
+        return list(executor.map(google, segments))
+
+def _translate_with_memory(sentences: List[str], src_lang: str, tgt_lang: str) -> str:
+    """Serve known sentences from the translation memory and translate only the misses."""
+    known = translation_memory.get_many(set(sentences), src_lang, tgt_lang)
+    misses = list(dict.fromkeys(s for s in sentences if s not in known))
+    print(f"🧠 Translation memory: {sum(s in known for s in sentences)}/{len(sentences)} sentences known")
+
+    if misses:
+        results = _translate_segments(misses, src_lang, tgt_lang)
+        # Only remember real translations, not pass-through fallbacks
+        learned = [(s, t) for s, t in zip(misses, results)
+                   if t and normalize_sentence(t) != normalize_sentence(s)]
+        try:
+            translation_memory.put_many(learned, src_lang, tgt_lang)
+        except Exception as e:
+            print(f"⚠️ Translation memory write failed: {e}")
+        for sentence, translated in zip(misses, results):
+            known[sentence] = translated or sentence
+
+    return " ".join(known[s] for s in sentences).strip()
+
+def translate_text(text: str, src_lang: str, tgt_lang: str) -> str:
+    """
+    Translation memory → Bhashini → Fallback: GoogleTranslator
+    Always returns a string. If all fail, returns the original text.
+    """
+    print(f"🌐 Translating: {src_lang} → {tgt_lang} ({len(text)} chars)")
+    # Sentence units for the memory; unpunctuated runs are still capped at 2000 chars
+    sentences = [piece for sentence in split_sentences(text) for piece in chunk_text(sentence, max_chars=2000)]
+    if TRANSLATION_MEMORY_ENABLED and sentences:
+        translated_text = _translate_with_memory(sentences, src_lang, tgt_lang)
+    else:
+        translated_text = _translate_uncached(text, src_lang, tgt_lang)
+        if translated_text is None:
+            print("❌ All translators failed. Returning original text.")
             return text
 
+    # Convert numbers to target language numerals
+    if tgt_lang != "en":
+        translated_text = convert_numbers_to_local(translated_text, tgt_lang)
+
+    return translated_text
+
+# -----------------------------
+# Chunk summarization (batched)
+def _summary_lengths(chunk: str) -> Tuple[int, int]:
+    """Adaptive (max_length, min_length) for one chunk, bucketed to SUMMARY_LENGTH_STEP."""
+    word_count = len(chunk.split())
+    max_len = max(80, int(word_count * 0.4))
+    # Round up, so bucketing never makes a chunk's summary shorter than its own limit
+    max_len = min(250, -(-max_len // SUMMARY_LENGTH_STEP) * SUMMARY_LENGTH_STEP)
+    min_len = max(30, int(max_len * 0.5))
+    return max_len, min_len
+
+def _fallback_summary(chunk: str) -> str:
+    # Fallback: take first few sentences
+    sentences = chunk.split('.')
+    return '. '.join(sentences[:3]) + '.'
+
+def _summarize_single(summarizer, chunk: str, max_len: int, min_len: int) -> str:
+    try:
+        out = summarizer(chunk, max_length=max_len, min_length=min_len, do_sample=False)
+        return out[0]["summary_text"].strip()
+    except Exception as e:
+        print(f"   ⚠️ Chunk summarization failed: {e}")
+        return _fallback_summary(chunk)
+
+def summarize_chunks(chunks: List[str], batch_size: int = None, on_chunk_summary=None) -> List[str]:
+    """
+    Summarize chunks as padded batches; returns summaries in input order.
+    Chunks are grouped by their bucketed (max_length, min_length), so chunks of similar
+    length share a forward pass, and sorted by length inside a group so batches carry
+    little padding.
+    Batches run on up to SUMMARY_MAP_WORKERS threads.
+    If a batch fails, its chunks are retried one by one (with the sentence fallback).
+    """
+    batch_size = max(1, batch_size or SUMMARY_BATCH_SIZE)
+    summarizer = get_summarizer()
+    summaries = [None] * len(chunks)
+    print(f"📊 Summarizing {len(chunks)} chunks (batch size {batch_size})...")
+
+    groups = {}
+    for index, chunk in enumerate(chunks):
+        groups.setdefault(_summary_lengths(chunk), []).append(index)
+
+    batches = []
+    for (max_len, min_len), indices in groups.items():
+        indices.sort(key=lambda i: len(chunks[i]))
+        for b in range(0, len(indices), batch_size):
+            batches.append((indices[b:b + batch_size], max_len, min_len))
+
+    def run_batch(batch, max_len, min_len):
+        print(f"   Chunks {[i + 1 for i in batch]} of {len(chunks)} (max_length={max_len})")
+        try:
+            outputs = summarizer(
+                [chunks[i] for i in batch],
+                max_length=max_len,
+                min_length=min_len,
+                do_sample=False,
+                batch_size=len(batch),
+            )
+            return [(out[0] if isinstance(out, list) else out)["summary_text"].strip() for out in outputs]
+        except Exception as e:
+            print(f"   ⚠️ Batch summarization failed ({e}), retrying chunks individually")
+            return [_summarize_single(summarizer, chunks[i], max_len, min_len) for i in batch]
+
+    workers = max(1, min(SUMMARY_MAP_WORKERS, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize") as executor:
+        futures = {executor.submit(run_batch, *batch): batch[0] for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            for i, summary_text in zip(batch, future.result()):
+                summaries[i] = summary_text
+                print(f"   ✓ Summary {i + 1}: {summary_text[:100]}...")
+                if on_chunk_summary:
+                    on_chunk_summary(i + 1, len(chunks), summary_text)
+
+    return summaries
+
+def reduce_summary(summary: str, target_tokens: int = None, max_levels: int = None) -> str:
+    """
+    Hierarchical reduce: while the joined chunk summaries are longer than
+    `target_tokens`, chunk them again and summarize level by level.
+    """
+    target_tokens = SUMMARY_TARGET_TOKENS if target_tokens is None else target_tokens
+    max_levels = SUMMARY_MAX_LEVELS if max_levels is None else max_levels
+    if target_tokens <= 0:
+        return summary
+
+    tokenizer = get_summarizer().tokenizer
+    tokens = len(tokenizer(summary, add_special_tokens=False)["input_ids"])
+    for level in range(1, max_levels + 1):
+        if tokens <= target_tokens:
+            break
+        chunks = chunk_for_summarizer(summary)
+        print(f"🔁 Reduce level {level}: {tokens} tokens in {len(chunks)} chunks → target {target_tokens}")
+        reduced = " ".join(summarize_chunks(chunks)).strip()
+        reduced_tokens = len(tokenizer(reduced, add_special_tokens=False)["input_ids"])
+        if reduced_tokens >= tokens:
+            # The model can't compress this any further
+            break
+        summary, tokens = reduced, reduced_tokens
+    return summary
+
 # -----------------------------
 # Summarization flow (IMPROVED)
 def summarize_pipeline(transcript: str, target_language: str = "en", video_url: str = None, device: str = "cpu") -> Tuple[str, str]:
     """
     Returns (english_summary, final_summary_in_target_lang)
     """
+    english_summary = summarize_to_english(transcript, video_url)
+    return english_summary, translate_summary(english_summary, target_language)
+
+def translate_summary(english_summary: str, target_language: str = "en") -> str:
+    """Translate an English summary to the target language (no-op for English)."""
+    if target_language and target_language.lower() != "en":
+        print(f"🔁 Translating summary → {target_language}")
+        final_summary = translate_text(english_summary, "en", target_language)
+        print(f"✅ Final summary length: {len(final_summary)} characters")
+        return final_summary
+    return english_summary
+
+def summarize_to_english(transcript: str, video_url: str = None, on_chunk_summary=None,
+                         metadata: dict = None) -> str:
+    """
+    Language-independent half of the pipeline: transcript → English summary.
+    `on_chunk_summary(index, total, text)` is called as each chunk summary is produced.
+    `metadata` (the video's record, if already known) supplies the description fallback.
+    """
     txt = (transcript or "").strip()
     
     # Check if transcript is too short
@@ -440,7 +1352,7 @@ def summarize_pipeline(transcript: str, target_language: str = "en", video_url:
         
         # Try to get YouTube description if video URL is provided
         if video_url:
-            description = get_youtube_description(video_url)
+            description = get_youtube_description(video_url, metadata)
             cleaned_description = clean_youtube_description(description)
             
             if cleaned_description and len(cleaned_description) > 50:
@@ -448,12 +1360,10 @@ def summarize_pipeline(transcript: str, target_language: str = "en", video_url:
                 txt = cleaned_description
             else:
                 # If description is not useful, return appropriate message
-                noise_message = "This video contains primarily noise or non-speech content. A meaningful summary cannot be generated."
-                return noise_message, translate_text(noise_message, "en", target_language)
+                return "This video contains primarily noise or non-speech content. A meaningful summary cannot be generated."
         else:
             # For non-YouTube content or if no URL provided
-            noise_message = "The audio content is too short or contains primarily noise. A meaningful summary cannot be generated."
-            return noise_message, translate_text(noise_message, "en", target_language)
+            return "The audio content is too short or contains primarily noise. A meaningful summary cannot be generated."
 
     src_lang = detect_language(txt)
     print(f"🌍 Detected transcript language: {src_lang}")
@@ -464,73 +1374,44 @@ def summarize_pipeline(transcript: str, target_language: str = "en", video_url:
         txt = translate_text(txt, src_lang, "en")
         print(f"✅ Translated transcript length: {len(txt)} characters")
 
-    # 2) Summarize in English with better chunking
-    english_chunks = []
-    text_chunks = chunk_text(txt, max_chars=2000)
-    
-    print(f"📊 Summarizing {len(text_chunks)} chunks...")
-    
-    for i, chunk in enumerate(text_chunks, 1):
-        print(f"   Chunk {i}/{len(text_chunks)} ({len(chunk)} chars)")
-        
-        # Adaptive summary length
-        word_count = len(chunk.split())
-        max_len = min(250, max(80, int(word_count * 0.4)))
-        min_len = max(30, int(max_len * 0.5))
-        
-        try:
-            out = summarizer_model(
-                chunk,
-                max_length=max_len,
-                min_length=min_len,
-                do_sample=False,
-            )
-            summary_text = out[0]["summary_text"].strip()
-            english_chunks.append(summary_text)
-            print(f"   ✓ Summary: {summary_text[:100]}...")
-        except Exception as e:
-            print(f"   ⚠️ Chunk summarization failed: {e}")
-            # Fallback: take first few sentences
-            sentences = chunk.split('.')
-            fallback_summary = '. '.join(sentences[:3]) + '.'
-            english_chunks.append(fallback_summary)
+    # 2) Summarize in English with sentence-aligned chunks packed to the model's input limit
+    text_chunks = chunk_for_summarizer(txt)
+    english_chunks = summarize_chunks(text_chunks, on_chunk_summary=on_chunk_summary)
 
     english_summary = " ".join(english_chunks).strip()
-    print(f"✅ English summary length: {len(english_summary)} characters")
 
-    # 3) Translate final summary to target language (if needed)
-    if target_language and target_language.lower() != "en":
-        print(f"🔁 Translating summary → {target_language}")
-        final_summary = translate_text(english_summary, "en", target_language)
-        print(f"✅ Final summary length: {len(final_summary)} characters")
-    else:
-        final_summary = english_summary
+    # 3) Long videos: reduce the chunk summaries until they fit the target length
+    english_summary = reduce_summary(english_summary)
+    print(f"✅ English summary length: {len(english_summary)} characters")
 
-    return english_summary, final_summary
+    return english_summary
 
 # -----------------------------
-# TTS
-def save_summary_as_audio(text_summary: str, language_code: str) -> str:
-    out_dir = Path("file")
+# TTS: sentence-level, concurrent and cached on disk (see tts.py for the backends),
+# then encoded once to the requested compressed format
+def save_summary_as_audio(text_summary: str, language_code: str, out_dir=Path("file"), on_progress=None,
+                          audio_format: str = None, bitrate: str = None) -> str:
+    out_dir = Path(out_dir)
     out_dir.mkdir(exist_ok=True)
-    out_path = out_dir / "summary.wav"
+    out_path = out_dir / "summary"
+    audio_format, bitrate = resolve_audio_format(audio_format, bitrate)
 
+    # Clean text for TTS
+    clean_text = ' '.join(text_summary.split()[:300])  # Limit length for TTS
+    progress = (lambda done, total: on_progress(done / total)) if on_progress else None
     try:
-        # Clean text for TTS
-        clean_text = ' '.join(text_summary.split()[:300])  # Limit length for TTS
-        
-        tts = gTTS(text=clean_text, lang=language_code, slow=False)
-        tts.save(out_path)
-        return str(out_path)
+        joined = synthesize_sentences(split_sentences(clean_text), language_code, out_dir / "summary_raw",
+                                      on_sentence=progress)
+        return str(encode_audio(joined, out_path, audio_format, bitrate))
     except Exception as e:
-        print(f"⚠️ gTTS failed for '{language_code}' → {e}. Falling back to English voice.")
+        print(f"⚠️ TTS failed for '{language_code}' → {e}. Falling back to English voice.")
         try:
-            tts = gTTS(text=text_summary[:300], lang="en", slow=False)
-            tts.save(out_path)
-            return str(out_path)
+            joined = synthesize_sentences(split_sentences(text_summary[:300]), "en", out_dir / "summary_raw")
+            return str(encode_audio(joined, out_path, audio_format, bitrate))
         except Exception:
             # Final fallback: create empty audio file
             import wave
+            out_path = out_path.with_suffix(".wav")
             with wave.open(str(out_path), 'wb') as wf:
                 wf.setnchannels(1)
                 wf.setsampwidth(2)
@@ -0,0 +1,176 @@
+# metrics.py
+import bisect
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Prometheus text exposition (format 0.0.4), served by GET /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stage latencies range from sub-second (cached translation) to tens of minutes (long transcriptions)
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Language labels come from request input; anything that isn't a language code is grouped
+_LANGUAGE_RE = re.compile(r"^[a-z]{2,3}$")
+
+
+def language_label(language: str) -> str:
+    """Bounded label value for a requested target language."""
+    return language if _LANGUAGE_RE.match(language or "") else "other"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, key)} {_number(v)}" for key, v in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (non-cumulative, last = +Inf), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        lines = self.header()
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Read at scrape time: `collect()` returns [(label values tuple, value), ...]."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Iterable[Tuple[Tuple, float]]],
+                 labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        try:
+            values = list(self.collect())
+        except Exception as e:
+            return [f"# {self.name} collection failed: {_escape(e)}"]
+        # Non-numeric values would make the whole exposition unparseable, so they are skipped
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(v)}"
+            for key, v in values if isinstance(v, (int, float)) and not isinstance(v, bool)
+        ]
+
+
+class ScrapedCounter(Gauge):
+    """A monotonic count kept elsewhere (e.g. cache hits), read at scrape time like a Gauge."""
+
+    kind = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Pipeline metrics shared by app.py and main.py
+STAGE_DURATION = registry.register(Histogram(
+    "videosu_stage_duration_seconds", "Wall time of pipeline stages that actually ran (cache hits excluded)",
+    ["stage"],
+))
+STAGE_RUNS = registry.register(Counter(
+    "videosu_stage_runs_total", "Pipeline stages started, by stage and target language", ["stage", "language"],
+))
+STAGE_ERRORS = registry.register(Counter(
+    "videosu_stage_errors_total", "Pipeline runs that failed, by failing stage and target language",
+    ["stage", "language"],
+))
+REQUESTS = registry.register(Counter(
+    "videosu_requests_total", "Summarize requests by target language and whether the result cache answered",
+    ["language", "cached"],
+))
+TRANSLATIONS = registry.register(Counter(
+    "videosu_translation_segments_total",
+    "Text segments translated, by the provider that produced the output (failed = left untranslated)",
+    ["provider"],
+))
@@ -0,0 +1,301 @@
+# tts.py
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import shutil
+import subprocess
+import threading
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gtts import gTTS
+
+# Engine used for summary speech (see TTS_BACKENDS)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts").strip().lower()
+# Sentences synthesized at once
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+# Per-sentence audio cache, keyed by (backend, language, text hash)
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Compressed formats the joined summary speech is encoded to (mono, ffmpeg). `bitrate` is
+# used when transcoding; gTTS's own MP3 (~32 kbps mono) is kept as-is unless a bitrate is asked for
+AUDIO_FORMATS = {
+    "mp3": {"extension": "mp3", "mime": "audio/mpeg", "codec": "libmp3lame", "bitrate": "32k"},
+    "opus": {"extension": "opus", "mime": "audio/ogg", "codec": "libopus", "bitrate": "32k"},
+}
+TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "mp3").strip().lower()
+# Empty = keep the synthesized audio when it is already in the requested format,
+# otherwise encode at the format's default bitrate above
+TTS_BITRATE = os.getenv("TTS_BITRATE", "").strip().lower()
+_BITRATE_RE = re.compile(r"^(\d{1,3})k$")
+
+for _fmt in AUDIO_FORMATS.values():
+    mimetypes.add_type(_fmt["mime"], f".{_fmt['extension']}")
+
+
+class TTSBackend(ABC):
+    """
+    A speech engine. `synthesize` returns one sentence of audio as bytes in the
+    backend's `extension` format ("mp3" frames can be joined as-is, "wav" clips
+    must share one sample format).
+    """
+
+    name = ""
+    extension = "mp3"
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str) -> bytes:
+        ...
+
+
+TTS_BACKENDS: Dict[str, TTSBackend] = {}
+
+
+def register_tts_backend(backend_cls):
+    """
+    Class decorator: make a TTSBackend selectable by its name (TTS_BACKEND=<name>).
+    Instantiating it here means a backend without `synthesize` fails at import time.
+    """
+    backend = backend_cls()
+    TTS_BACKENDS[backend.name] = backend
+    return backend_cls
+
+
+@register_tts_backend
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service (network, MP3)."""
+
+    name = "gtts"
+    extension = "mp3"
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+@register_tts_backend
+class ESpeakBackend(TTSBackend):
+    """Local, offline espeak-ng voices (WAV). Lower quality, no network calls."""
+
+    name = "espeak"
+    extension = "wav"
+
+    def available(self) -> bool:
+        return shutil.which("espeak-ng") is not None
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        result = subprocess.run(
+            ["espeak-ng", "-v", lang, "--stdout", text],
+            capture_output=True, check=True,
+        )
+        return result.stdout
+
+
+def get_tts_backend(name: str = None) -> TTSBackend:
+    name = (name or TTS_BACKEND).strip().lower()
+    backend = TTS_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose one of: {', '.join(TTS_BACKENDS)}")
+    if not backend.available():
+        raise RuntimeError(f"TTS backend '{name}' is not available on this machine")
+    return backend
+
+
+class SentenceAudioCache:
+    """
+    Synthesized sentences on disk, one file per (backend, language, text) under
+    a two-character shard directory. Oldest files are removed past `max_bytes`.
+    """
+
+    def __init__(self, root: Path = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, backend: TTSBackend, lang: str, text: str) -> Path:
+        digest = hashlib.sha256(f"{backend.name}|{lang}|{' '.join(text.split())}".encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.{backend.extension}"
+
+    def get_or_synthesize(self, backend: TTSBackend, lang: str, text: str) -> bytes:
+        path = self._path(backend, lang, text)
+        try:
+            data = path.read_bytes()
+            path.touch()
+            with self._lock:
+                self.hits += 1
+            return data
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.misses += 1
+        data = backend.synthesize(text, lang)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % 100 == 0
+        if prune:
+            self.prune()
+        return data
+
+    def prune(self) -> int:
+        """Delete least recently used sentence files until the cache fits. Returns files removed."""
+        files = []
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+sentence_audio_cache = SentenceAudioCache()
+
+
+def _join_wav(clips: List[bytes]) -> bytes:
+    out = io.BytesIO()
+    writer = None
+    for clip in clips:
+        with wave.open(io.BytesIO(clip), "rb") as reader:
+            if writer is None:
+                writer = wave.open(out, "wb")
+                writer.setparams(reader.getparams())
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    if writer is not None:
+        writer.close()
+    return out.getvalue()
+
+
+def synthesize_sentences(sentences: List[str], lang: str, out_path: Path, backend: TTSBackend = None,
+                         on_sentence: Callable[[int, int], None] = None) -> Path:
+    """
+    Synthesize `sentences` concurrently (each one cached on disk), join the clips
+    in order and write them to `out_path` with the backend's file extension.
+    """
+    backend = backend or get_tts_backend()
+    sentences = [s for s in (s.strip() for s in sentences) if s]
+    if not sentences:
+        raise ValueError("Nothing to synthesize")
+    done = [0]
+    done_lock = threading.Lock()
+
+    def synthesize(sentence):
+        data = sentence_audio_cache.get_or_synthesize(backend, lang, sentence)
+        if on_sentence:
+            with done_lock:
+                done[0] += 1
+                on_sentence(done[0], len(sentences))
+        return data
+
+    with ThreadPoolExecutor(max_workers=max(1, min(TTS_CONCURRENCY, len(sentences))),
+                            thread_name_prefix="tts") as pool:
+        clips = list(pool.map(synthesize, sentences))
+
+    out_path = Path(out_path).with_suffix(f".{backend.extension}")
+    # MP3 is a sequence of self-contained frames, so clips can simply be appended
+    # (gTTS joins its own request chunks the same way)
+    out_path.write_bytes(_join_wav(clips) if backend.extension == "wav" else b"".join(clips))
+    return out_path
+
+
+def resolve_audio_format(audio_format: str = None, bitrate: str = None) -> Tuple[str, Optional[str]]:
+    """
+    Validate a requested (format, bitrate) pair, filling in the default format; raises ValueError.
+    The bitrate stays None when neither the caller nor TTS_BITRATE sets one (see encode_audio).
+    """
+    audio_format = (audio_format or TTS_OUTPUT_FORMAT).strip().lower()
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unknown audio format '{audio_format}'. Choose one of: {', '.join(AUDIO_FORMATS)}")
+    bitrate = (bitrate or TTS_BITRATE or "").strip().lower()
+    if not bitrate:
+        return audio_format, None
+    match = _BITRATE_RE.match(bitrate)
+    if not match or not 8 <= int(match.group(1)) <= 320:
+        raise ValueError(f"Invalid audio bitrate '{bitrate}', expected 8k-320k")
+    return audio_format, bitrate
+
+
+def encode_audio(source: Path, target_stem: Path, audio_format: str, bitrate: str = None) -> Path:
+    """
+    Encode `source` to `audio_format` at `bitrate` as <target_stem>.<ext>.
+    A source already in that format is moved into place without a lossy re-encode
+    when no bitrate was asked for (and, without ffmpeg, whenever the formats match).
+    """
+    spec = AUDIO_FORMATS[audio_format]
+    source = Path(source)
+    target = Path(target_stem).with_suffix(f".{spec['extension']}")
+    if bitrate is None and source.suffix == target.suffix:
+        os.replace(source, target)
+        return target
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", str(source),
+        "-vn", "-ac", "1", "-c:a", spec["codec"], "-b:a", bitrate or spec["bitrate"], str(target),
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        if source.suffix != target.suffix:
+            raise RuntimeError(f"Could not encode summary audio to {audio_format}: {e}")
+        os.replace(source, target)
+        return target
+    source.unlink(missing_ok=True)
+    return target
+
+
+def probe_audio(path: Path) -> dict:
+    """Format, MIME type, size, duration and bitrate of an audio file (duration/bitrate need ffprobe)."""
+    path = Path(path)
+    info = {
+        "format": path.suffix.lstrip("."),
+        "mime_type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        "size_bytes": path.stat().st_size,
+        "duration_seconds": None,
+        "bitrate": None,
+    }
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration,bit_rate", "-of", "json", str(path)],
+            capture_output=True, check=True,
+        )
+        fmt = json.loads(result.stdout or b"{}").get("format", {})
+        if fmt.get("duration") not in (None, "N/A"):
+            info["duration_seconds"] = round(float(fmt["duration"]), 2)
+        if fmt.get("bit_rate") not in (None, "N/A"):
+            info["bitrate"] = int(fmt["bit_rate"])
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        pass
+    return info
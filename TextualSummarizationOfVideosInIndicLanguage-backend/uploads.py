@@ -0,0 +1,116 @@
+# uploads.py
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+
+# Audio extracted from uploads: 16 kHz mono FLAC is lossless for Whisper's input
+# and a small fraction of the size of the original video
+UPLOAD_AUDIO_NAME = "upload_audio.flac"
+UPLOAD_AUDIO_ARGS = ["-vn", "-ac", "1", "-ar", "16000", "-c:a", "flac"]
+
+
+def _ffmpeg_command(source: str, target: Path) -> list:
+    return ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", source] + UPLOAD_AUDIO_ARGS + [str(target)]
+
+
+class UploadSink:
+    """
+    Writable target for one uploaded file, filled chunk by chunk while the request
+    body is still arriving. Every chunk is hashed, teed to disk and piped into
+    ffmpeg, which keeps only the audio track. finish() returns the audio file once
+    the upload is complete; the teed copy is only kept when extraction fails.
+    """
+
+    def __init__(self, workspace: Path):
+        self.workspace = Path(workspace)
+        self.raw_path = self.workspace / "upload"
+        self.audio_path = self.workspace / UPLOAD_AUDIO_NAME
+        self.size = 0
+        self.adopted = False
+        self._digest = hashlib.sha256()
+        self._raw = open(self.raw_path, "w+b")
+        try:
+            self._ffmpeg = subprocess.Popen(
+                _ffmpeg_command("pipe:0", self.audio_path),
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            # No ffmpeg: the upload is still saved and decoded later as-is
+            self._ffmpeg = None
+
+    # File-like interface used by the multipart parser (and FileStorage)
+    def write(self, chunk: bytes) -> int:
+        self._raw.write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        if self._ffmpeg is not None:
+            try:
+                self._ffmpeg.stdin.write(chunk)
+            except OSError:
+                # ffmpeg gave up on the pipe (e.g. it needs to seek); finish() retries from disk
+                self._stop_ffmpeg()
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._raw.read(size)
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def finish(self) -> str:
+        """Complete the audio extraction and return the path the pipeline should use."""
+        self._raw.flush()
+        ok = False
+        if self._ffmpeg is not None:
+            try:
+                self._ffmpeg.stdin.close()
+            except OSError:
+                pass
+            ok = self._ffmpeg.wait() == 0
+            self._ffmpeg = None
+        if not ok and self.size:
+            # Containers indexed at the end (MP4 with a trailing moov atom) can't be
+            # demuxed from a pipe, so extract again from the teed copy
+            try:
+                ok = subprocess.run(
+                    _ffmpeg_command(str(self.raw_path), self.audio_path),
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                ).returncode == 0
+            except OSError:
+                ok = False
+        self._raw.close()
+        if ok and self.audio_path.exists() and self.audio_path.stat().st_size > 0:
+            self.raw_path.unlink(missing_ok=True)
+            return str(self.audio_path)
+        return str(self.raw_path)
+
+    def _stop_ffmpeg(self):
+        if self._ffmpeg is not None:
+            self._ffmpeg.kill()
+            self._ffmpeg.wait()
+            self._ffmpeg = None
+
+    def close(self):
+        self._stop_ffmpeg()
+        self._raw.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._raw.closed
@@ -1,7 +1,7 @@
 # frontend/app.py
 import streamlit as st
 import requests
-import base64
+import os
 import re
 import time
 import json
@@ -21,6 +21,24 @@ LANGUAGES = {
     "English": "en",
 }
 
+# Whisper speed/quality tiers offered by the backend (`whisper_tier`)
+WHISPER_TIERS = {
+    "Balanced (default)": "balanced",
+    "Fast": "fast",
+    "Accurate (slowest)": "accurate",
+}
+
+# Summary speech formats offered by the backend (`audio_format`)
+AUDIO_FORMATS = {
+    "MP3": "mp3",
+    "Opus (smaller)": "opus",
+}
+
+# Job polling (backend runs the pipeline asynchronously)
+JOB_POLL_INTERVAL = 2
+JOB_TIMEOUT_SECONDS = 1800
+JOB_STAGE_COUNT = 4
+
 # Initialize session state
 if 'result' not in st.session_state:
     st.session_state.result = None
@@ -245,61 +263,64 @@ def show_confidence_metrics():
     """Display confidence metrics in the dashboard"""
     st.markdown("### 🤖 Confidence Metrics")
     
-    try:
-        # Get confidence metrics from backend
-        response = requests.post(
-            f"{st.session_state.api_base}/confidence_metrics",
-            json={"transcript": st.session_state.result.get("transcript", "")},
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            metrics = response.json()
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>Word Count</h4>
-                        <h2>{metrics.get("word_count", 0)}</h2>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>Unique Words</h4>
-                        <h2>{metrics.get("unique_words", 0)}</h2>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>Lexical Diversity</h4>
-                        <h2>{metrics.get('lexical_diversity', 0) * 100:.1f}%</h2>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>Confidence Score</h4>
-                        <h2>{metrics.get('confidence_score', 0) * 100:.1f}%</h2>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            # Audio quality gauge
-            audio_quality = metrics.get("audio_quality", 0.5)
-            st.markdown("#### Audio Quality Score")
-            st.progress(audio_quality, text=f"{audio_quality * 100:.1f}%")
-            
-        else:
-            st.warning("Could not fetch confidence metrics")
-            
-    except Exception as e:
-        st.error(f"Error fetching metrics: {str(e)}")
+    # Computed by the backend from Whisper's segment scores and returned with the result
+    metrics = st.session_state.result.get("confidence") or {}
+    if metrics.get("confidence_score") is None:
+        st.info("Confidence metrics are not available for this result")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h4>Word Count</h4>
+                <h2>{metrics.get("word_count", 0)}</h2>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h4>Confidence Score</h4>
+                <h2>{metrics.get('confidence_score', 0) * 100:.1f}%</h2>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h4>Low-Confidence Speech</h4>
+                <h2>{metrics.get('low_confidence_ratio', 0) * 100:.1f}%</h2>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h4>Repetitive Segments</h4>
+                <h2>{(metrics.get('repetition_ratio') or 0) * 100:.1f}%</h2>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    # Audio quality gauge
+    audio_quality = metrics.get("audio_quality")
+    if audio_quality is not None:
+        st.markdown("#### Audio Quality Score")
+        st.progress(audio_quality, text=f"{audio_quality * 100:.1f}%")
+
+    # Least confident passages, to spot-check the transcript
+    segments_url = (st.session_state.result.get("artifacts") or {}).get("segments")
+    if segments_url and st.checkbox("Show least confident segments"):
+        try:
+            response = requests.get(f"{st.session_state.api_base}{segments_url}", timeout=30)
+            response.raise_for_status()
+            scored = [s for s in response.json() if s.get("confidence") is not None]
+            for segment in sorted(scored, key=lambda s: s["confidence"])[:5]:
+                st.write(f"`{format_timestamp(segment['start'])}` "
+                         f"({segment['confidence'] * 100:.0f}%) {segment['text']}")
+        except Exception as e:
+            st.error(f"Error fetching segments: {str(e)}")
 
 def show_processing_stats():
     """Display processing statistics"""
@@ -487,7 +508,9 @@ with col2:
             if health_response.status_code == 200:
                 try:
                     data = health_response.json()
-                    if data.get("status") == "healthy":
+                    if data.get("status") == "healthy" and data.get("ready", True) is False:
+                        st.info("⏳ Backend connected, models are still loading. Jobs will start once they are ready.")
+                    elif data.get("status") == "healthy":
                         st.success("✅ Backend connected successfully!")
                     else:
                         st.warning("⚠️ Backend responded but status not healthy")
@@ -529,10 +552,15 @@ col3, col4 = st.columns(2)
 with col3:
     selected_lang = st.selectbox("Select Target Language for Summary", list(LANGUAGES.keys()))
     lang_code = LANGUAGES[selected_lang]
+    selected_tier = st.selectbox("Transcription Quality", list(WHISPER_TIERS.keys()),
+                                 help="Fast is quickest; Accurate uses a larger model and beam search")
+    whisper_tier = WHISPER_TIERS[selected_tier]
 
 with col4:
     show_english = st.checkbox("Show English summary", value=True)
     show_stats = st.checkbox("Show video stats", value=True)
+    selected_format = st.selectbox("Audio Format", list(AUDIO_FORMATS.keys()))
+    audio_format = AUDIO_FORMATS[selected_format]
 
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -546,6 +574,62 @@ def clean_transcript(text: str) -> str:
     cleaned = re.sub(r"\s+", " ", cleaned).strip()
     return cleaned if cleaned else "Transcript not available."
 
+# ----------------------------
+# Helper: Job Progress
+# ----------------------------
+def parse_sse(lines):
+    """Yield (event, data) pairs from a text/event-stream response."""
+    event, data = "message", []
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+def follow_job_events(job_id, progress_bar, status_text, live_text):
+    """Show real stage progress, live transcript segments and chunk summaries."""
+    stage_progress = {}
+    segments = []
+    url = f"{st.session_state.api_base}/jobs/{job_id}/events"
+    with requests.get(url, stream=True, timeout=(10, 60)) as stream:
+        stream.raise_for_status()
+        for event, data in parse_sse(stream.iter_lines()):
+            if event == "stage":
+                stage_progress[data["stage"]] = data.get("progress", 0)
+                overall = sum(stage_progress.values()) / JOB_STAGE_COUNT
+                progress_bar.progress(min(100, int(overall * 100)))
+                status_text.caption(f"Job {job_id}: {data['stage'].replace('_', ' ')} ({data['status']})")
+            elif event == "segment":
+                segments.append(f"[{format_timestamp(data['start'])}] {data['text']}")
+                live_text.text("\n".join(segments[-8:]))
+            elif event == "chunk_summary":
+                live_text.markdown(f"**Summary part {data['index']}/{data['total']}:** {data['text']}")
+            elif event in ("result", "error"):
+                return
+
+def poll_job(job_id, progress_bar, status_text):
+    """Poll the job status until the backend worker finishes."""
+    deadline = time.time() + JOB_TIMEOUT_SECONDS
+    while True:
+        status = requests.get(f"{st.session_state.api_base}/jobs/{job_id}", timeout=10).json()
+        progress_bar.progress(int(status.get("progress", 0) * 100))
+        stage = status.get("current_stage") or "queued"
+        status_text.caption(f"Job {job_id}: {status.get('status')} ({stage.replace('_', ' ')})")
+        if status.get("status") in ("succeeded", "failed"):
+            return
+        if time.time() > deadline:
+            raise requests.exceptions.Timeout()
+        time.sleep(JOB_POLL_INTERVAL)
+
+def format_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
 # ----------------------------
 # Generate Summary
 # ----------------------------
@@ -559,20 +643,28 @@ if st.button("🚀 Generate Summary", type="primary", use_container_width=True):
             progress_bar = st.progress(0)
             
             try:
-                # Simulate progress (you can replace this with actual progress updates if your backend supports it)
-                for percent_complete in range(0, 101, 10):
-                    progress_bar.progress(percent_complete)
-                    time.sleep(0.1)
-                
                 if input_method == "Upload Video":
                     files = {"file": video_file}
-                    data = {"language": lang_code}
-                    response = requests.post(f"{st.session_state.api_base}/summarize", data=data, files=files, timeout=600)
+                    data = {"language": lang_code, "whisper_tier": whisper_tier, "audio_format": audio_format, "async": "1"}
                 else:
                     files = {}
-                    data = {"url": video_url, "language": lang_code}
-                    response = requests.post(f"{st.session_state.api_base}/summarize", data=data, files=files, timeout=600)
+                    data = {"url": video_url, "language": lang_code, "whisper_tier": whisper_tier,
+                            "audio_format": audio_format, "async": "1"}
+                submit = requests.post(f"{st.session_state.api_base}/summarize", data=data, files=files, timeout=120)
+                submit_data = submit.json()
+                if submit.status_code != 202:
+                    raise RuntimeError(submit_data.get("error", "Job submission failed"))
+
+                # Follow the job's live event stream; fall back to polling if it drops
+                job_id = submit_data["job_id"]
+                status_text = st.empty()
+                live_text = st.empty()
+                try:
+                    follow_job_events(job_id, progress_bar, status_text, live_text)
+                except requests.exceptions.RequestException:
+                    poll_job(job_id, progress_bar, status_text)
 
+                response = requests.get(f"{st.session_state.api_base}/jobs/{job_id}/result", timeout=60)
                 progress_bar.progress(100)
                 result = response.json()
 
@@ -601,15 +693,27 @@ if st.button("🚀 Generate Summary", type="primary", use_container_width=True):
                     with tab3:
                         st.markdown("<div class='section-card'>", unsafe_allow_html=True)
                         st.markdown("### Audio Summary")
-                        audio_b64 = result.get("summary_audio")
-                        if audio_b64:
-                            audio_bytes = base64.b64decode(audio_b64)
-                            st.audio(audio_bytes, format="audio/wav")
+                        audio_url = result.get("summary_audio_url")
+                        audio_response = None
+                        if audio_url:
+                            try:
+                                audio_response = requests.get(f"{st.session_state.api_base}{audio_url}", timeout=60)
+                                audio_response.raise_for_status()
+                            except requests.exceptions.RequestException:
+                                audio_response = None
+                        if audio_response is not None:
+                            audio_mime = audio_response.headers.get("Content-Type", "audio/mpeg").split(";")[0]
+                            st.audio(audio_response.content, format=audio_mime)
+                            audio_info = result.get("summary_audio_info") or {}
+                            if audio_info.get("duration_seconds"):
+                                st.caption(f"{audio_info.get('format', '').upper()} · "
+                                           f"{audio_info['duration_seconds']:.1f}s · "
+                                           f"{audio_info.get('size_bytes', 0) / 1024:.0f} KB")
                             st.download_button(
                                 "⬇️ Download Audio", 
-                                audio_bytes, 
-                                file_name=f"summary_{lang_code}.wav", 
-                                mime="audio/wav"
+                                audio_response.content, 
+                                file_name=f"summary_{lang_code}{os.path.splitext(audio_url)[1]}", 
+                                mime=audio_mime
                             )
                         else:
                             st.info("No audio generated.")